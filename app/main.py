@@ -1,3 +1,7 @@
+import functools
+import hashlib
+import importlib.util
+import mmap
 import os
 import re
 import shutil
@@ -5,15 +9,31 @@ import subprocess
 import sys
 import tempfile
 import threading
-import urllib.request
+import time
+import weakref
 from pathlib import Path
 
-from PySide6.QtCore import QFile, QPoint, Qt, QTimer, QTextStream, QRegularExpression
+from PySide6.QtCore import (
+    QBuffer,
+    QByteArray,
+    QElapsedTimer,
+    QIODevice,
+    QObject,
+    QPoint,
+    QProcess,
+    QProcessEnvironment,
+    QRegularExpression,
+    QSaveFile,
+    Qt,
+    QTimer,
+)
 from PySide6.QtGui import (
     QAction,
     QColor,
     QFont,
     QPalette,
+    QTextBlockFormat,
+    QTextBlockUserData,
     QTextCharFormat,
     QTextCursor,
     QTextDocument,
@@ -32,6 +52,7 @@ from PySide6.QtWidgets import (
     QMenuBar,
     QMessageBox,
     QPlainTextEdit,
+    QProgressDialog,
     QSplitter,
     QStackedWidget,
     QStatusBar,
@@ -41,6 +62,7 @@ from PySide6.QtWidgets import (
     QToolBar,
     QToolButton,
     QTreeView,
+    QWidget,
     QDialog,
     QCheckBox,
     QGridLayout,
@@ -52,49 +74,295 @@ from PySide6.QtWidgets import (
 )
 
 try:
-    import tensorflow as tf
-    from tensorflow.keras import layers
-except Exception:  # pragma: no cover - optional dependency
-    tf = None
-    layers = None
+    import hyperscan
+except ImportError:  # pragma: no cover - optional dependency
+    hyperscan = None
+
+# TensorFlow costs seconds and hundreds of MB to import, so it is only pulled in
+# by the assistant's background loader (see _import_tensorflow).
+np = None
+tf = None
+layers = None
+
+
+def _import_tensorflow() -> bool:
+    global np, tf, layers
+    if tf is not None:
+        return True
+    try:
+        import numpy
+        import tensorflow
+        from tensorflow.keras import layers as keras_layers
+    except Exception:  # pragma: no cover - optional dependency
+        return False
+    np, tf, layers = numpy, tensorflow, keras_layers
+    return True
+
+
+# One alternation instead of six independent scans per block. Longer constructs
+# come first so ``\begin{..}``/``\cite{..}`` win over the bare command rule;
+# ``$..$`` and ``$$..$$`` share one branch and an escaped ``\%`` is not a comment.
+_HIGHLIGHT_RE = re.compile(
+    r"(?P<env>\\(?:begin|end)\{[^}]+\})"
+    r"|(?P<ref>\\(?:cite|ref)\{[^}]+\})"
+    r"|(?P<cmd>\\[A-Za-z@]+)"
+    r"|(?P<math>\$\$?[^$]+\$\$?)"
+    r"|(?P<comment>(?<!\\)%.*)"
+)
 
 
-class LatexHighlighter(QSyntaxHighlighter):
-    def __init__(self, document):  # type: ignore[override]
-        super().__init__(document)
-        self._rules: list[tuple[QRegularExpression, QTextCharFormat]] = []
+def _build_formats() -> dict[str, QTextCharFormat]:
+    command_format = QTextCharFormat()
+    command_format.setForeground(QColor("#0a66c2"))
+    command_format.setFontWeight(QFont.Weight.DemiBold)
+
+    comment_format = QTextCharFormat()
+    comment_format.setForeground(QColor("#6b7280"))
+    comment_format.setFontItalic(True)
+
+    math_format = QTextCharFormat()
+    math_format.setForeground(QColor("#7c3aed"))
+
+    brace_format = QTextCharFormat()
+    brace_format.setForeground(QColor("#0f766e"))
+
+    ref_format = QTextCharFormat()
+    ref_format.setForeground(QColor("#be5a0e"))
+    ref_format.setFontWeight(QFont.Weight.Medium)
 
-        command_format = QTextCharFormat()
-        command_format.setForeground(QColor("#0a66c2"))
-        command_format.setFontWeight(QFont.Weight.DemiBold)
+    return {
+        "env": brace_format,
+        "ref": ref_format,
+        "cmd": command_format,
+        "math": math_format,
+        "comment": comment_format,
+    }
 
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("#6b7280"))
-        comment_format.setFontItalic(True)
 
-        math_format = QTextCharFormat()
-        math_format.setForeground(QColor("#7c3aed"))
+# Shared by every highlighter so new tabs do not allocate their own formats.
+_HIGHLIGHT_FORMATS = _build_formats()
 
-        brace_format = QTextCharFormat()
-        brace_format.setForeground(QColor("#0f766e"))
 
-        ref_format = QTextCharFormat()
-        ref_format.setForeground(QColor("#be5a0e"))
-        ref_format.setFontWeight(QFont.Weight.Medium)
+class _PendingHighlight(QTextBlockUserData):
+    """Marks a block whose highlighting was skipped and still has to run."""
 
-        self._rules.append((QRegularExpression(r"\\[A-Za-z@]+"), command_format))
-        self._rules.append((QRegularExpression(r"%.*$"), comment_format))
-        self._rules.append((QRegularExpression(r"\\begin\{[^}]+\}|\\end\{[^}]+\}"), brace_format))
-        self._rules.append((QRegularExpression(r"\$[^$]+\$"), math_format))
-        self._rules.append((QRegularExpression(r"\$\$[^$]+\$\$"), math_format))
-        self._rules.append((QRegularExpression(r"\\(cite|ref)\{[^}]+\}"), ref_format))
+
+class LatexHighlighter(QSyntaxHighlighter):
+    # Edits spanning more blocks than this (pastes, file loads, replace-all) are
+    # highlighted once the burst settles instead of synchronously per block.
+    _DEFER_BLOCKS = 40
+    # Blocks this far outside the viewport are left for when they scroll in.
+    _VISIBLE_MARGIN = 200
+
+    def __init__(self, document, editor=None):  # type: ignore[override]
+        super().__init__(None)
+        self.setParent(document)
+        self._deferring = False
+        self._editor = weakref.ref(editor) if editor is not None else None
+        self._visible = (0, self._VISIBLE_MARGIN)
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(40)
+        self._flush_timer.timeout.connect(self._rehighlight_visible)
+        # Bracket Qt's own reformat slot so we know the size of the edit that
+        # triggered each highlightBlock call.
+        document.contentsChange.connect(self._begin_change)
+        self.setDocument(document)
+        document.contentsChange.connect(self._end_change)
+        if editor is not None:
+            editor.verticalScrollBar().valueChanged.connect(self._schedule_visible_pass)
+
+    def _begin_change(self, position: int, _removed: int, added: int) -> None:
+        doc = self.document()
+        end = min(position + added, doc.characterCount() - 1)
+        span = doc.findBlock(end).blockNumber() - doc.findBlock(position).blockNumber()
+        self._deferring = span > self._DEFER_BLOCKS
+        if self._deferring:
+            self._flush_timer.start()
+
+    def _end_change(self, *_args) -> None:
+        self._deferring = False
+
+    def _schedule_visible_pass(self, *_args) -> None:
+        self._flush_timer.start()
+
+    def _rehighlight_visible(self) -> None:
+        editor = self._editor() if self._editor is not None else None
+        doc = self.document()
+        if editor is not None:
+            first = editor.firstVisibleBlock().blockNumber()
+            last = editor.cursorForPosition(QPoint(0, editor.viewport().height())).blockNumber()
+        else:
+            first = last = 0
+        self._visible = (first - self._VISIBLE_MARGIN, last + self._VISIBLE_MARGIN)
+
+        block = doc.findBlockByNumber(max(0, self._visible[0]))
+        while block.isValid() and block.blockNumber() <= self._visible[1]:
+            if isinstance(block.userData(), _PendingHighlight):
+                self.rehighlightBlock(block)
+            block = block.next()
 
     def highlightBlock(self, text: str) -> None:  # type: ignore[override]
-        for pattern, fmt in self._rules:
-            match_iter = pattern.globalMatch(text)
-            while match_iter.hasNext():
-                match = match_iter.next()
-                self.setFormat(match.capturedStart(), match.capturedLength(), fmt)
+        block_no = self.currentBlock().blockNumber()
+        if self._deferring or not self._visible[0] <= block_no <= self._visible[1]:
+            self.setCurrentBlockUserData(_PendingHighlight())
+            return
+        if self.currentBlockUserData() is not None:
+            self.setCurrentBlockUserData(None)
+        # Plain prose has no token that can start a rule; skip the regex engine.
+        if "\\" not in text and "%" not in text and "$" not in text:
+            return
+        formats = _HIGHLIGHT_FORMATS
+        for match in _HIGHLIGHT_RE.finditer(text):
+            start = match.start()
+            self.setFormat(start, match.end() - start, formats[match.lastgroup])
+
+
+_INTENTS = ("figures", "references", "compile", "structure", "writing")
+
+_INTENT_KEYWORDS = {
+    "figure": "figures",
+    "image": "figures",
+    "includegraphics": "figures",
+    "graphic": "figures",
+    "cite": "references",
+    "bib": "references",
+    "reference": "references",
+    "bibliography": "references",
+    "error": "compile",
+    "compile": "compile",
+    "log": "compile",
+    "latexmk": "compile",
+    "pdflatex": "compile",
+    "section": "structure",
+    "chapter": "structure",
+    "table": "structure",
+    "structure": "structure",
+    "organization": "structure",
+    "toc": "structure",
+    "outline": "structure",
+    "abstract": "writing",
+    "conclusion": "writing",
+    "paragraph": "writing",
+    "writing": "writing",
+}
+# Longest keywords first so "bibliography" is one hit rather than "bib" + rest.
+_INTENT_KEYWORD_RE = re.compile(
+    "|".join(re.escape(keyword) for keyword in sorted(_INTENT_KEYWORDS, key=len, reverse=True))
+)
+
+# Figures, sections and compile errors counted in one pass over the document.
+_DOC_STATS_RE = re.compile(
+    r"(?P<figure>\\includegraphics\{[^}]+\})"
+    r"|(?P<section>\\section\{[^}]+\})"
+    r"|(?P<error>! (?P<errmsg>.+))"
+)
+
+_PROMPT_TOKEN_RE = re.compile(r"[A-Za-z]{3,}")
+
+
+@functools.lru_cache(maxsize=1)
+def _hyperscan_stats_db():
+    """Block-mode Hyperscan database for the three alternatives of _DOC_STATS_RE."""
+    database = hyperscan.Database()
+    database.compile(
+        expressions=[
+            rb"\\includegraphics\{[^}]+\}",
+            rb"\\section\{[^}]+\}",
+            rb"! [^\n]",
+        ],
+        ids=[0, 1, 2],
+        elements=3,
+        flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * 3,
+    )
+    return database
+
+
+def _document_stats_hyperscan(document: str) -> tuple[int, int, str | None] | None:
+    """Hyperscan version of the _DOC_STATS_RE pass, or None if it cannot tell.
+
+    Hyperscan reports every match, overlapping ones included, while
+    ``finditer`` resumes after each match it takes; the spans are replayed
+    here the same way, so e.g. a ``\\section{}`` on a ``! `` error line is not
+    counted by either path.
+    """
+    data = document.encode("utf-8")
+    matches: list[tuple[int, int, int]] = []
+
+    def on_match(pattern_id: int, start: int, end: int, _flags: int, _context) -> None:
+        if pattern_id == 2:
+            # Like ``! .+``, an error runs to the end of its line.
+            end = data.find(b"\n", start)
+            if end == -1:
+                end = len(data)
+        matches.append((start, end, pattern_id))
+
+    _hyperscan_stats_db().scan(data, match_event_handler=on_match)
+    counts = [0, 0]
+    first_error_start: int | None = None
+    position = 0
+    for start, end, pattern_id in sorted(matches):
+        if start < position:
+            if end > position and pattern_id != 2:
+                # Only the leftmost start is reported per end offset, so a
+                # later start that finditer would match here is unknown.
+                return None
+            continue
+        position = end
+        if pattern_id == 2:
+            if first_error_start is None:
+                first_error_start = start
+        else:
+            counts[pattern_id] += 1
+    first_error: str | None = None
+    if first_error_start is not None:
+        start = first_error_start + 2
+        end = data.find(b"\n", start)
+        first_error = data[start : end if end != -1 else len(data)].decode("utf-8", errors="replace")
+    return counts[0], counts[1], first_error
+
+
+@functools.lru_cache(maxsize=8)
+def _document_stats(document: str) -> tuple[int, int, str | None]:
+    """Return ``(figures, sections, first compile error)`` for ``document``.
+
+    Cached because the assistant is usually asked several questions about the
+    same unchanged text; an edited document is a different key and misses.
+    """
+    if hyperscan is not None:
+        # One SIMD pass over the bytes when the optional dependency is present.
+        stats = _document_stats_hyperscan(document)
+        if stats is not None:
+            return stats
+    counts = {"figure": 0, "section": 0, "error": 0}
+    first_error: str | None = None
+    for match in _DOC_STATS_RE.finditer(document):
+        kind = match.lastgroup
+        counts[kind] += 1
+        if kind == "error" and first_error is None:
+            first_error = match.group("errmsg")
+    return counts["figure"], counts["section"], first_error
+
+
+# "l.42" is how TeX reports the input line an error occurred on.
+_LATEX_ERR_RE = re.compile(r"l\.(\d+)")
+# An uncommented \include on a line; QTextDocument.find applies it per block.
+_INCLUDE_QRE = QRegularExpression(r"^[^%]*\\include\{")
+_INCLUDE_ARG_RE = re.compile(r"\\include\{([^}]*)\}")
+# Tail of the log shown in the error pane; QPlainTextEdit crawls on multi-MB text.
+_ERROR_PANE_CHARS = 64_000
+# Bytes of compiler output kept while a build runs; older lines are only
+# scanned for error line numbers and then dropped.
+_COMPILE_LOG_BYTES = 256 * 1024
+# Files longer than this open with their head shown at once; the rest is
+# appended in slices from the event loop so the window never freezes.
+_LOAD_HEAD_CHARS = 1_000_000
+_LOAD_CHUNK_CHARS = 64_000
+
+
+@functools.lru_cache(maxsize=16)
+def _search_pattern(term: str) -> re.Pattern:
+    return re.compile(term)
 
 
 class SearchDialog(QDialog):
@@ -160,33 +428,124 @@ class SearchDialog(QDialog):
 class LatexChatAssistant:
     """A lightweight TensorFlow-backed helper that stays offline-friendly.
 
-    The assistant first tries to download a tiny intent model; if that fails it
-    trains a miniature network on synthetic LaTeX prompts so answers remain
-    instant and private. When TensorFlow is not available, it falls back to
+    The assistant loads a cached tiny intent model or trains a miniature
+    network on synthetic LaTeX prompts, on a background thread, so answers
+    remain instant and private. When TensorFlow is not available, it falls back to
     deterministic hints so the UI continues to work for every user.
     """
 
     def __init__(self, storage_dir: Path | None = None):
-        self.available = tf is not None and layers is not None
+        self.available = importlib.util.find_spec("tensorflow") is not None
         self.model_dir = storage_dir or Path.home() / ".platex" / "assistant"
         self.model_dir.mkdir(parents=True, exist_ok=True)
         self.model_path = self.model_dir / "latex_helper.keras"
+        self.tflite_path = self.model_dir / "latex_helper.tflite"
         self.model: "tf.keras.Model | None" = None
-        self._ensure_model_lazy()
+        self._predict_fn = None
+        # Users often re-ask the same question; remember the predicted intent.
+        self._cached_intent = functools.lru_cache(maxsize=64)(self._predict_intent)
+        # Loading or training the model takes seconds; do it off the UI thread
+        # and answer with heuristics until it is ready.
+        self._ready = threading.Event()
+        self._loader_lock = threading.Lock()
+        self._loader_started = False
+        if not self.available:
+            self._ready.set()
+
+    def warm_up(self) -> None:
+        """Start importing TensorFlow and loading the model in the background."""
+        with self._loader_lock:
+            if self._loader_started or not self.available:
+                return
+            self._loader_started = True
+        threading.Thread(target=self._load_in_background, daemon=True).start()
+
+    def _load_in_background(self) -> None:
+        try:
+            self.available = _import_tensorflow()
+            self._ensure_model_lazy()
+        except Exception:  # pragma: no cover - defensive guard
+            self.model = None
+            self._predict_fn = None
+        finally:
+            self._ready.set()
+
+    @staticmethod
+    def _keras_predict_fn(model):
+        # A fixed input signature keeps a single traced graph instead of letting
+        # Model.predict rebuild its step function and re-check inputs per call.
+        @tf.function(input_signature=[tf.TensorSpec([None, 1], tf.string)])
+        def predict(batch):
+            return model(batch, training=False)
+
+        return lambda prompt: predict(tf.constant([[prompt]]))[0].numpy()
+
+    @staticmethod
+    def _tflite_predict_fn(path: Path):
+        interpreter = tf.lite.Interpreter(model_path=str(path))
+        interpreter.allocate_tensors()
+        input_index = interpreter.get_input_details()[0]["index"]
+        output_index = interpreter.get_output_details()[0]["index"]
+        # The interpreter is stateful and replies are computed on worker threads.
+        lock = threading.Lock()
+
+        def predict(prompt: str):
+            with lock:
+                interpreter.set_tensor(input_index, np.array([[prompt.encode("utf-8")]]))
+                interpreter.invoke()
+                return interpreter.get_tensor(output_index)[0]
+
+        return predict
+
+    def _export_tflite(self, model) -> None:
+        """Write a quantized TFLite copy of ``model`` so later launches load in ms."""
+        try:
+            converter = tf.lite.TFLiteConverter.from_keras_model(model)
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            # TextVectorization needs TF string ops, so the weights are quantized
+            # (dynamic range) while the string lookup stays a select TF op.
+            converter.target_spec.supported_ops = [
+                tf.lite.OpsSet.TFLITE_BUILTINS,
+                tf.lite.OpsSet.SELECT_TF_OPS,
+            ]
+            self.tflite_path.write_bytes(converter.convert())
+        except Exception:
+            self.tflite_path.unlink(missing_ok=True)
+
+    def _predict_intent(self, prompt: str) -> str:
+        preds = self._predict_fn(prompt)
+        return _INTENTS[int(preds.argmax())]
 
     def _ensure_model_lazy(self) -> None:
         if not self.available:
             return
+        if self.tflite_path.exists():
+            try:
+                predict = self._tflite_predict_fn(self.tflite_path)
+                predict("warm up")
+                self._predict_fn = predict
+                return
+            except Exception:
+                self.tflite_path.unlink(missing_ok=True)
+
         if self.model_path.exists():
             try:
                 self.model = tf.keras.models.load_model(self.model_path)
-                return
             except Exception:
                 self.model_path.unlink(missing_ok=True)
 
-        # Stay offline-first: train a tiny local model instead of attempting any
-        # remote downloads. If training fails, we'll fall back to heuristics.
-        self.model = self._train_tiny_model()
+        if self.model is None:
+            # Stay offline-first: train a tiny local model instead of attempting any
+            # remote downloads. If training fails, we'll fall back to heuristics.
+            self.model = self._train_tiny_model()
+        if self.model is None:
+            return
+
+        self._export_tflite(self.model)
+        predict = self._keras_predict_fn(self.model)
+        # Trace the graph now rather than on the user's first question.
+        predict("warm up")
+        self._predict_fn = predict
 
     def _train_tiny_model(self):
         if not self.available:
@@ -207,7 +566,6 @@ class LatexChatAssistant:
             ]
         )
         labels = tf.constant([0, 1, 2, 3, 4, 0, 1, 2, 4, 3], dtype=tf.int32)
-        intents = ["figures", "references", "compile", "structure", "writing"]
 
         vectorizer = layers.TextVectorization(
             max_tokens=2000,
@@ -221,21 +579,18 @@ class LatexChatAssistant:
         x = layers.Embedding(2000, 32)(x)
         x = layers.GlobalAveragePooling1D()(x)
         x = layers.Dense(48, activation="relu")(x)
-        outputs = layers.Dense(len(intents), activation="softmax")(x)
+        outputs = layers.Dense(len(_INTENTS), activation="softmax")(x)
 
         model = tf.keras.Model(inputs, outputs)
         model.compile(optimizer="adam", loss="sparse_categorical_crossentropy", metrics=["accuracy"])
         model.fit(texts, labels, epochs=12, batch_size=2, verbose=0)
         model.save(self.model_path)
-        self.intents = intents
         return model
 
     def _intent_to_message(
         self, intent: str, prompt: str, document: str, context_hint: tuple[str, str] | None
     ) -> str:
-        figure_count = len(re.findall(r"\\includegraphics\{[^}]+\}", document))
-        section_count = len(re.findall(r"\\section\{[^}]+\}", document))
-        compile_errors = re.findall(r"! (.+)", document)
+        _figure_count, section_count, first_error = _document_stats(document)
 
         if intent == "figures":
             message = (
@@ -248,7 +603,7 @@ class LatexChatAssistant:
                 "the Compile PDF button will trigger it automatically."
             )
         elif intent == "compile":
-            hint = compile_errors[0] if compile_errors else "Check missing packages or unmatched braces."
+            hint = first_error or "Check missing packages or unmatched braces."
             message = f"Compilation tips: {hint} — ensure your preamble loads needed packages and rerun Compile PDF."
         elif intent == "structure":
             message = (
@@ -269,9 +624,15 @@ class LatexChatAssistant:
     def respond(self, prompt: str, document: str, project_context: str = "") -> str:
         if not prompt.strip():
             return "Ask anything about your LaTeX document, structure, or errors."
+        self.warm_up()
 
         context_hint = self._extract_context_hint(prompt, project_context or document)
 
+        # Keywords settle almost every question without touching the model.
+        intent = self._keyword_intent(prompt)
+        if intent is not None:
+            return self._intent_to_message(intent, prompt, document, context_hint)
+
         # Fast heuristic fallback if TensorFlow is missing or still loading.
         def fallback() -> str:
             intent = self._fallback_intent(prompt)
@@ -280,34 +641,31 @@ class LatexChatAssistant:
         if not self.available:
             return fallback()
 
-        if self.model is None:
+        if not self._ready.is_set() or self._predict_fn is None:
             return fallback()
 
         try:
-            preds = self.model.predict([prompt], verbose=0)[0]
-            intent_idx = int(preds.argmax())
-            intent = ["figures", "references", "compile", "structure", "writing"][intent_idx]
+            intent = self._cached_intent(prompt)
             return self._intent_to_message(intent, prompt, document, context_hint)
         except Exception:
             return fallback()
 
+    def _keyword_intent(self, prompt: str) -> str | None:
+        hits = dict.fromkeys(_INTENTS, 0)
+        for match in _INTENT_KEYWORD_RE.finditer(prompt.lower()):
+            hits[_INTENT_KEYWORDS[match.group()]] += 1
+        # max() keeps the first of equal counts, so ties follow _INTENTS order.
+        best = max(_INTENTS, key=hits.__getitem__)
+        return best if hits[best] else None
+
     def _fallback_intent(self, prompt: str) -> str:
-        text = prompt.lower()
-        if any(keyword in text for keyword in ["figure", "image", "includegraphics", "graphic"]):
-            return "figures"
-        if any(keyword in text for keyword in ["cite", "bib", "reference", "bibliography"]):
-            return "references"
-        if any(keyword in text for keyword in ["error", "compile", "log", "latexmk", "pdflatex"]):
-            return "compile"
-        if any(keyword in text for keyword in ["section", "structure", "organization", "toc", "outline"]):
-            return "structure"
-        return "writing"
+        return self._keyword_intent(prompt) or "writing"
 
     def _extract_context_hint(self, prompt: str, context_text: str) -> tuple[str, str] | None:
         if not context_text.strip():
             return None
 
-        tokens = [t for t in re.findall(r"[A-Za-z]{3,}", prompt.lower())]
+        tokens = _PROMPT_TOKEN_RE.findall(prompt.lower())
         if not tokens:
             return None
 
@@ -332,6 +690,8 @@ class LatexChatAssistant:
 
 
 class ChatDialog(QDialog):
+    MAX_MESSAGES = 200
+
     def __init__(self, parent, on_send):
         super().__init__(parent)
         self.setWindowTitle("Document Assistant")
@@ -367,17 +727,265 @@ class ChatDialog(QDialog):
         layout.addWidget(title)
         layout.addWidget(self.conversation)
         layout.addLayout(row)
+        self._cursor = QTextCursor(self.conversation.document())
 
     def append_message(self, author: str, text: str) -> None:
         safe_text = text.replace("\n", "<br>")
-        self.conversation.append(f"<b>{author}:</b> {safe_text}")
+        document = self.conversation.document()
+        # One block per message, inserted at the end, so appending does not
+        # touch earlier messages and the oldest one is a single block to drop.
+        self._cursor.movePosition(QTextCursor.MoveOperation.End)
+        if not document.isEmpty():
+            self._cursor.insertBlock(QTextBlockFormat(), QTextCharFormat())
+        self._cursor.insertHtml(f"<b>{author}:</b> {safe_text}")
+        if document.blockCount() > self.MAX_MESSAGES:
+            oldest = QTextCursor(document)
+            oldest.movePosition(QTextCursor.MoveOperation.NextBlock, QTextCursor.MoveMode.KeepAnchor)
+            oldest.removeSelectedText()
         self.conversation.verticalScrollBar().setValue(self.conversation.verticalScrollBar().maximum())
 
     def clear_entry(self) -> None:
         self.prompt_edit.clear()
 
 
+_TEMPLATES = {
+    "Article": """\\documentclass{article}
+\\usepackage[utf8]{inputenc}
+\\usepackage{amsmath,amssymb}
+\\title{Your Title}
+\\author{Your Name}
+\\begin{document}
+\\maketitle
+
+\\section{Introduction}
+Start writing here.
+
+\\end{document}
+""",
+    "Report": """\\documentclass{report}
+\\usepackage[utf8]{inputenc}
+\\usepackage{graphicx}
+\\title{Project Report}
+\\author{Your Name}
+\\begin{document}
+\\maketitle
+
+\\chapter{Overview}
+Content goes here.
+
+\\end{document}
+""",
+    "Beamer": """\\documentclass{beamer}
+\\usetheme{Madrid}
+\\title{Your Talk}
+\\author{Your Name}
+\\begin{document}
+\\begin{frame}\titlepage\end{frame}
+\\begin{frame}{Agenda}
+  \begin{itemize}
+    \item Point 1
+    \item Point 2
+  \end{itemize}
+\\end{frame}
+\\end{document}
+""",
+}
+
+_SNIPPETS = {
+    "figure": """\\begin{figure}[h]
+  \centering
+  \includegraphics[width=0.8\\linewidth]{example-image}
+  \caption{Caption text}
+  \label{fig:label}
+\\end{figure}
+
+""",
+    "table": """\\begin{table}[h]
+  \centering
+  \begin{tabular}{lll}
+    \hline
+    A & B & C \\
+    \hline
+    1 & 2 & 3 \\
+    4 & 5 & 6 \\
+    \hline
+  \end{tabular}
+  \caption{Table caption}
+  \label{tab:label}
+\\end{table}
+
+""",
+    "bibliography": """% Add this near the end of your document
+\\bibliographystyle{plain}
+\\bibliography{references}
+
+% Example .bib entry
+% @article{key,
+%   title={Example},
+%   author={Author, A.},
+%   journal={Journal},
+%   year={2024}
+% }
+""",
+    "section": """\\section{New Section}
+Write your section text here.
+
+""",
+    "equation": """\\begin{equation}
+E = mc^2
+\\end{equation}
+
+""",
+    "list": """\\begin{itemize}
+  \item First item
+  \item Second item
+\\end{itemize}
+
+""",
+    "toc": """% Table of contents
+\\tableofcontents
+\\newpage
+
+""",
+    "theorem": """% Add to preamble: \\usepackage{amsthm}
+\\begin{theorem}[Sample]
+Let a, b \in \mathbb{R}. Then a + b = b + a.
+\\end{theorem}
+
+""",
+    "code": """% Add to preamble: \\usepackage{listings}
+\\begin{lstlisting}[language=Python, caption={Example code}]
+def hello():
+    print("Hello, PLATEX!")
+\\end{lstlisting}
+
+""",
+}
+
+_APP_STYLESHEET = """
+QMainWindow { background: #e9edf3; }
+QStatusBar { font-weight: 600; background: #ffffff; color: #0b172a; padding-left: 8px; border-top: 1px solid #dbe2ec; }
+QTreeView { background: #f7f9fb; border-right: 1px solid #dbe2ec; }
+QTreeView#projectTree { alternate-background-color: #eef3f8; font-size: 11px; }
+QTreeView#projectTree::item { padding: 4px 6px; }
+QTreeView#projectTree::item:selected { background: #d7e7fb; color: #0a66c2; border-radius: 6px; }
+QTabBar::tab { padding: 9px 12px; background: #f5f7fa; border: 1px solid #dbe2ec; border-radius: 8px; }
+QTabBar::tab:selected { background: #ffffff; color: #0a66c2; border: 1px solid #0a66c2; }
+QTabBar::tab:hover { background: #eef3f8; }
+QToolBar { font-weight: 600; background: #ffffff; spacing: 8px; padding: 8px; border-bottom: 1px solid #dbe2ec; }
+QToolBar QToolButton { color: #0b172a; padding: 7px 10px; border-radius: 8px; }
+QToolBar QToolButton:hover { background: #e9eef5; }
+QToolBar QToolButton:checked { background: #d7e7fb; color: #0a66c2; }
+QToolButton#snippetButton { background: #0a66c2; color: white; padding: 8px 12px;
+    border-radius: 8px; font-weight: 600; letter-spacing: 0.3px; }
+QToolButton#snippetButton::menu-indicator { image: none; }
+QToolButton#snippetButton:hover { background: #004182; }
+QMenuBar { background: #ffffff; border-bottom: 1px solid #dbe2ec; }
+QMenuBar::item { padding: 6px 10px; margin: 2px; }
+QMenuBar::item:selected { background: #e9eef5; color: #0a66c2; border-radius: 6px; }
+QMenu { border-radius: 8px; background: #ffffff; border: 1px solid #dbe2ec; }
+QMenu::item:selected { background: #e9eef5; color: #0a66c2; }
+QPushButton { background: #0a66c2; color: white; border: none; border-radius: 8px; padding: 8px 12px; }
+QPushButton:hover { background: #004182; }
+QLineEdit { padding: 8px 10px; border: 1px solid #dbe2ec; border-radius: 8px; }
+QLineEdit:focus { border-color: #0a66c2; }
+QPlainTextEdit#latexEditor { padding: 14px; border: 1px solid #dbe2ec; border-radius: 10px; background: #fdfefe; }
+QPlainTextEdit#latexEditor:focus { border: 1px solid #0a66c2; }
+QPlainTextEdit#latexEditor QScrollBar:vertical { background: #e9eef5; width: 12px; border-radius: 6px; }
+QPlainTextEdit#latexEditor QScrollBar::handle:vertical { background: #0a66c2; min-height: 30px; border-radius: 6px; }
+QPlainTextEdit#latexEditor QScrollBar::add-line:vertical,
+QPlainTextEdit#latexEditor QScrollBar::sub-line:vertical { height: 0; }
+QPlainTextEdit#compileLog { background: #0b172a; color: #e5f1fb; border-left: 1px solid #dbe2ec;
+    padding: 12px; font-family: 'JetBrains Mono', 'Consolas', 'Courier New'; font-size: 12px; }
+QPdfView { background: #eef2f7; border-left: 1px solid #dbe2ec; }
+"""
+
+# (attribute, label, slot) for the plain window actions.
+_ACTION_SPECS = (
+    ("new_project_action", "New Project Folder", "create_project"),
+    ("open_project_action", "Open Project Folder", "open_project"),
+    ("new_action", "New", "new_file"),
+    ("open_action", "Open…", "open_file"),
+    ("save_action", "Save", "save_file"),
+    ("save_as_action", "Save As…", "save_file_as"),
+    ("compile_action", "Compile PDF", "compile_pdf"),
+    ("template_action", "New from Template", "new_from_template"),
+    ("add_figure_file_action", "Add Figure from File…", "add_figure_from_file"),
+    ("search_action", "Find…", "search_in_file"),
+    ("open_pdf_action", "Open PDF Externally", "open_pdf_externally"),
+    ("rescan_compiler_action", "Rescan LaTeX Compiler", "rescan_compiler"),
+    ("about_action", "About", "show_about"),
+    ("project_help_action", "Project files & tabs", "show_project_help"),
+    ("assistant_action", "Ask Document Assistant", "ask_document_assistant"),
+)
+
+# (snippet kind, label); each becomes ``self.<kind>_action``.
+_SNIPPET_ACTIONS = (
+    ("section", "Insert Section"),
+    ("figure", "Insert Figure"),
+    ("table", "Insert Table"),
+    ("bibliography", "Insert Bibliography"),
+    ("equation", "Insert Equation"),
+    ("list", "Insert List"),
+    ("toc", "Insert TOC"),
+    ("theorem", "Insert Theorem"),
+    ("code", "Insert Code"),
+)
+
+
+class AsyncCmdRunner(QObject):
+    """Run a list of commands one after another in QProcesses.
+
+    Failures do not stop the chain (the old ``subprocess.run(check=False)``
+    behaviour); ``on_output`` gets the last line each command printed and
+    ``on_done`` is called once everything has run or the chain was cancelled.
+    """
+
+    def __init__(self, parent, commands: list[list[str]], on_output, on_done):
+        super().__init__(parent)
+        self._commands = list(commands)
+        self._on_output = on_output
+        self._on_done = on_done
+        self._process: QProcess | None = None
+
+    def start(self) -> None:
+        if not self._commands:
+            self._process = None
+            self._on_done()
+            return
+        argv = self._commands.pop(0)
+        process = QProcess(self)
+        process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        process.readyReadStandardOutput.connect(lambda: self._forward_output(process))
+        process.finished.connect(lambda *_: self._next(process))
+        process.errorOccurred.connect(
+            lambda error: self._next(process) if error == QProcess.ProcessError.FailedToStart else None
+        )
+        self._process = process
+        process.start(argv[0], argv[1:])
+
+    def cancel(self) -> None:
+        self._commands.clear()
+        if self._process is not None:
+            self._process.kill()
+
+    def _forward_output(self, process: QProcess) -> None:
+        lines = bytes(process.readAllStandardOutput().data()).decode("utf-8", errors="replace").splitlines()
+        for line in reversed(lines):
+            if line.strip():
+                self._on_output(line.strip())
+                break
+
+    def _next(self, process: QProcess) -> None:
+        if process is not self._process:
+            return
+        process.deleteLater()
+        self.start()
+
+
 class EditorWindow(QMainWindow):
+    MAX_SEARCH_HIGHLIGHTS = 2000
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("PLATEX – Lightweight LaTeX Editor")
@@ -390,33 +998,83 @@ class EditorWindow(QMainWindow):
         self.current_file: Path | None = None
         self.project_root: Path | None = None
         self.last_pdf_output: Path | None = None
+        self._last_pdf_stat: tuple[str, int, int] | None = None
+        self._last_pdf_digest: bytes | None = None
+        # path -> (content digest, st_mtime_ns, st_size) right after our last save.
+        self._saved_state: dict[str, tuple[bytes, int, int]] = {}
         self.is_compiling = False
+        self._compiler_cache: str | None = None
+        # The process environment does not change while we run, so build the
+        # compiler's copy once; callers needing extra variables copy it first.
+        self._compile_env = QProcessEnvironment.systemEnvironment()
+        for key in ("MIKTEX_AUTOINSTALL", "MIKTEX_ON_THE_FLY"):
+            if not self._compile_env.contains(key):
+                self._compile_env.insert(key, "1")
+        # Live builds pin the dates and /ID that pdfTeX, XeTeX and LuaTeX write
+        # into the PDF, so rebuilding unchanged text yields identical bytes.
+        # \today is unaffected unless FORCE_SOURCE_DATE is also set. Explicit
+        # builds keep real timestamps.
+        self._live_env = QProcessEnvironment(self._compile_env)
+        if not self._live_env.contains("SOURCE_DATE_EPOCH"):
+            self._live_env.insert("SOURCE_DATE_EPOCH", str(int(time.time())))
+        # id(editor) -> (edit serial, content digest, whether that build
+        # made the PDF) of the last good build.
+        self._last_compiled_rev: dict[int, tuple[int, bytes, bool]] = {}
+        self._install_runner: AsyncCmdRunner | None = None
+        self.compile_proc: QProcess | None = None
+        self._compile_timed_out = False
+        self._compile_log = bytearray()
+        self._compile_log_marks: list[int] = []
+        self._compile_is_auto = False
+        self._compile_superseded = False
+        self._compile_killable = True
+        self._protect_next_live_build = False
+        self._manual_compile_pending = False
+        self.latexmk_daemon: QProcess | None = None
+        self._daemon_file: Path | None = None
+        self._daemon_editor: QPlainTextEdit | None = None
+        self._daemon_log = b""
+        # Preamble formats dumped with mylatexformat, keyed by .tex path and
+        # valid only for the preamble digest they were built from.
+        self._preamble_formats: dict[str, bytes] = {}
+        self._format_unavailable: set[tuple[str, bytes]] = set()
+        self._format_proc: QProcess | None = None
+        QApplication.instance().aboutToQuit.connect(self._shutdown_processes)
         self.live_preview_enabled = True
+        # Leading-edge debounce: the first edit builds at once and this timer
+        # then guards the burst; edits made meanwhile (or during a build) fold
+        # into one trailing build. The guard follows how long live builds take.
         self.live_preview_timer = QTimer(self)
         self.live_preview_timer.setSingleShot(True)
-        self.live_preview_timer.setInterval(500)
-        self.live_preview_timer.timeout.connect(lambda: self.compile_pdf(auto=True))
+        self.live_preview_timer.setInterval(600)
+        self.live_preview_timer.timeout.connect(self._on_live_preview_guard)
+        self._compile_clock = QElapsedTimer()
+        self._recompile_pending = False
+        # After a clean draft pass, produce the real PDF once edits stop.
+        self.full_render_timer = QTimer(self)
+        self.full_render_timer.setSingleShot(True)
+        self.full_render_timer.setInterval(2000)
+        self.full_render_timer.timeout.connect(lambda: self.compile_pdf(auto=True, draft=False))
+        # Search highlights only cover the viewport; coalesce keystrokes in the
+        # search box and scroll events into one pass.
+        self._search_highlight_query: tuple[str, bool] = ("", False)
+        self._highlight_timer = QTimer(self)
+        self._highlight_timer.setSingleShot(True)
+        self._highlight_timer.setInterval(80)
+        self._highlight_timer.timeout.connect(self._apply_search_highlights)
         self.status = QStatusBar()
-        self.status.setStyleSheet(
-            "QStatusBar { background: #ffffff; color: #0b172a; padding-left: 8px; border-top: 1px solid #dbe2ec; }"
-        )
         self.setStatusBar(self.status)
 
         self.preview_document = QPdfDocument(self)
+        self._pdf_buffer: QBuffer | None = None
         self.preview = QPdfView()
         self.preview.setDocument(self.preview_document)
         self.preview.setZoomMode(QPdfView.ZoomMode.FitToWidth)
-        self.preview.setStyleSheet(
-            "QPdfView { background: #eef2f7; border-left: 1px solid #dbe2ec; }"
-        )
 
         self.preview_errors = QPlainTextEdit()
+        self.preview_errors.setObjectName("compileLog")
         self.preview_errors.setReadOnly(True)
         self.preview_errors.setWordWrapMode(QTextOption.NoWrap)
-        self.preview_errors.setStyleSheet(
-            "QPlainTextEdit { background: #0b172a; color: #e5f1fb; border-left: 1px solid #dbe2ec;"
-            " padding: 12px; font-family: 'JetBrains Mono', 'Consolas', 'Courier New'; font-size: 12px; }"
-        )
 
         self.preview_stack = QStackedWidget()
         self.preview_stack.addWidget(self.preview)
@@ -427,13 +1085,17 @@ class EditorWindow(QMainWindow):
         self.tabs.setTabsClosable(True)
         self.tabs.tabCloseRequested.connect(self._close_tab)
         self.tabs.currentChanged.connect(self._tab_changed)
+        # Tabs are movable, so map paths to widgets rather than to positions.
+        # Plain dicts also avoid boxing paths into QVariant tab data.
+        self._tab_by_path: dict[str, QWidget] = {}
+        self._tab_paths: dict[int, Path | None] = {}
         first_editor = self._create_editor_widget()
         first_index = self.tabs.addTab(first_editor, "Untitled.tex")
         self._set_tab_path(first_index, None)
 
         self.file_model = QFileSystemModel()
-        self.file_model.setRootPath(str(Path.home()))
         self.file_view = QTreeView()
+        self.file_view.setObjectName("projectTree")
         self.file_view.setModel(self.file_model)
         self.file_view.setHeaderHidden(True)
         self.file_view.hideColumn(1)
@@ -441,12 +1103,9 @@ class EditorWindow(QMainWindow):
         self.file_view.hideColumn(3)
         self.file_view.doubleClicked.connect(self._open_from_tree)
         self.file_view.setMinimumWidth(180)
-        self.file_view.setStyleSheet(
-            "QTreeView { alternate-background-color: #eef3f8; font-size: 11px; }"
-            "QTreeView::item { padding: 4px 6px; }"
-            "QTreeView::item:selected { background: #d7e7fb; color: #0a66c2; border-radius: 6px; }"
-        )
-        self._refresh_file_tree()
+        # Walking the home directory on a cold cache can take seconds; let the
+        # window paint first.
+        QTimer.singleShot(0, self._refresh_file_tree)
 
         splitter = QSplitter()
         splitter.addWidget(self.file_view)
@@ -461,6 +1120,15 @@ class EditorWindow(QMainWindow):
         self._update_title()
         self.search_dialog: SearchDialog | None = None
 
+    def _shutdown_processes(self) -> None:
+        self._stop_latexmk_daemon()
+        if self._format_proc is not None:
+            self._format_proc.kill()
+            self._format_proc.waitForFinished(1000)
+        if self.compile_proc is not None:
+            self.compile_proc.kill()
+            self.compile_proc.waitForFinished(1000)
+
     def _apply_theme(self) -> None:
         base_font = QFont("Inter", 11)
         base_font.setHintingPreference(QFont.HintingPreference.PreferFullHinting)
@@ -481,24 +1149,10 @@ class EditorWindow(QMainWindow):
         palette.setColor(QPalette.Link, QColor("#0a66c2"))
         self.setPalette(palette)
 
-        QApplication.instance().setStyleSheet(
-            """
-            QMainWindow { background: #e9edf3; }
-            QStatusBar { font-weight: 600; }
-            QTreeView { background: #f7f9fb; border-right: 1px solid #dbe2ec; }
-            QTabBar::tab { padding: 9px 12px; background: #f5f7fa; border: 1px solid #dbe2ec; border-radius: 8px; }
-            QTabBar::tab:selected { background: #ffffff; color: #0a66c2; border: 1px solid #0a66c2; }
-            QTabBar::tab:hover { background: #eef3f8; }
-            QToolBar { font-weight: 600; }
-            QPushButton { background: #0a66c2; color: white; border: none; border-radius: 8px; padding: 8px 12px; }
-            QPushButton:hover { background: #004182; }
-            QLineEdit { padding: 8px 10px; border: 1px solid #dbe2ec; border-radius: 8px; }
-            QLineEdit:focus { border-color: #0a66c2; }
-            QMenu { border-radius: 8px; }
-            """
-        )
+        # One application-wide sheet: Qt parses it once instead of per widget.
+        QApplication.instance().setStyleSheet(_APP_STYLESHEET)
 
-    def _style_editor(self, editor: QTextEdit) -> None:
+    def _style_editor(self, editor: QPlainTextEdit) -> None:
         font = QFont("Inter", 12)
         font.setHintingPreference(QFont.HintingPreference.PreferFullHinting)
         editor.setFont(font)
@@ -508,99 +1162,43 @@ class EditorWindow(QMainWindow):
         palette.setColor(QPalette.Highlight, QColor("#0a66c2"))
         palette.setColor(QPalette.HighlightedText, QColor("#ffffff"))
         editor.setPalette(palette)
-        editor.setStyleSheet(
-            "QTextEdit { padding: 14px; border: 1px solid #dbe2ec; border-radius: 10px;"
-            " background: #fdfefe; }"
-            "QTextEdit:focus { border: 1px solid #0a66c2; }"
-            "QScrollBar:vertical { background: #e9eef5; width: 12px; border-radius: 6px; }"
-            "QScrollBar::handle:vertical { background: #0a66c2; min-height: 30px; border-radius: 6px; }"
-            "QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical { height: 0; }"
-        )
+        editor.setObjectName("latexEditor")
 
-    def _create_editor_widget(self) -> QTextEdit:
-        editor = QTextEdit()
-        editor.setAcceptRichText(False)
+    def _create_editor_widget(self) -> QPlainTextEdit:
+        editor = QPlainTextEdit()
         editor.setTabStopDistance(32)
-        editor.setLineWrapMode(QTextEdit.NoWrap)
+        editor.setLineWrapMode(QPlainTextEdit.NoWrap)
         self._style_editor(editor)
         self._attach_editor_context(editor)
-        editor.textChanged.connect(self._schedule_live_preview)
-        editor.highlighter = LatexHighlighter(editor.document())  # type: ignore[attr-defined]
+        # textChanged also fires when the highlighter reformats blocks;
+        # contentsChange only reports real insertions and removals.
+        editor.edit_serial = 0  # type: ignore[attr-defined]
+        editor.loading = False  # type: ignore[attr-defined]
+        editor.document().contentsChange.connect(
+            lambda _position, removed, added, editor=editor: self._on_contents_change(editor, removed, added)
+        )
+        editor.verticalScrollBar().valueChanged.connect(self._schedule_search_highlights)
+        editor.highlighter = LatexHighlighter(editor.document(), editor)  # type: ignore[attr-defined]
         return editor
 
     def _create_actions(self) -> None:
-        self.new_project_action = QAction("New Project Folder", self)
-        self.new_project_action.triggered.connect(self.create_project)
-
-        self.open_project_action = QAction("Open Project Folder", self)
-        self.open_project_action.triggered.connect(self.open_project)
-
-        self.new_action = QAction("New", self)
-        self.new_action.triggered.connect(self.new_file)
-
-        self.open_action = QAction("Open…", self)
-        self.open_action.triggered.connect(self.open_file)
-
-        self.save_action = QAction("Save", self)
-        self.save_action.triggered.connect(self.save_file)
-
-        self.save_as_action = QAction("Save As…", self)
-        self.save_as_action.triggered.connect(lambda: self.save_file(save_as=True))
-
-        self.compile_action = QAction("Compile PDF", self)
-        self.compile_action.triggered.connect(self.compile_pdf)
+        for attr, label, slot in _ACTION_SPECS:
+            action = QAction(label, self)
+            action.triggered.connect(getattr(self, slot))
+            setattr(self, attr, action)
 
         self.live_preview_action = QAction("Live Preview", self, checkable=True)
         self.live_preview_action.setChecked(True)
         self.live_preview_action.triggered.connect(self._toggle_live_preview)
 
-        self.template_action = QAction("New from Template", self)
-        self.template_action.triggered.connect(self.new_from_template)
-
-        self.figure_action = QAction("Insert Figure", self)
-        self.figure_action.triggered.connect(lambda: self.insert_snippet("figure"))
-
-        self.table_action = QAction("Insert Table", self)
-        self.table_action.triggered.connect(lambda: self.insert_snippet("table"))
-
-        self.bibliography_action = QAction("Insert Bibliography", self)
-        self.bibliography_action.triggered.connect(lambda: self.insert_snippet("bibliography"))
-
-        self.section_action = QAction("Insert Section", self)
-        self.section_action.triggered.connect(lambda: self.insert_snippet("section"))
-
-        self.equation_action = QAction("Insert Equation", self)
-        self.equation_action.triggered.connect(lambda: self.insert_snippet("equation"))
-
-        self.list_action = QAction("Insert List", self)
-        self.list_action.triggered.connect(lambda: self.insert_snippet("list"))
-
-        self.toc_action = QAction("Insert TOC", self)
-        self.toc_action.triggered.connect(lambda: self.insert_snippet("toc"))
-
-        self.theorem_action = QAction("Insert Theorem", self)
-        self.theorem_action.triggered.connect(lambda: self.insert_snippet("theorem"))
-
-        self.code_action = QAction("Insert Code", self)
-        self.code_action.triggered.connect(lambda: self.insert_snippet("code"))
-
-        self.add_figure_file_action = QAction("Add Figure from File…", self)
-        self.add_figure_file_action.triggered.connect(self.add_figure_from_file)
-
-        self.search_action = QAction("Find…", self)
-        self.search_action.triggered.connect(self.search_in_file)
-
-        self.open_pdf_action = QAction("Open PDF Externally", self)
-        self.open_pdf_action.triggered.connect(self.open_pdf_externally)
-
-        self.about_action = QAction("About", self)
-        self.about_action.triggered.connect(self.show_about)
-
-        self.project_help_action = QAction("Project files & tabs", self)
-        self.project_help_action.triggered.connect(self.show_project_help)
-
-        self.assistant_action = QAction("Ask Document Assistant", self)
-        self.assistant_action.triggered.connect(self.ask_document_assistant)
+        # One action per snippet, shared by the Insert menu, the toolbar's
+        # Snippets button and the editor context menu.
+        self._snippet_actions: list[QAction] = []
+        for kind, label in _SNIPPET_ACTIONS:
+            action = QAction(label, self)
+            action.triggered.connect(lambda _checked=False, kind=kind: self.insert_snippet(kind))
+            setattr(self, f"{kind}_action", action)
+            self._snippet_actions.append(action)
 
     def _create_menus(self) -> None:
         menu_bar = QMenuBar(self)
@@ -619,34 +1217,21 @@ class EditorWindow(QMainWindow):
         project_menu.addAction(self.template_action)
 
         insert_menu = menu_bar.addMenu("Insert")
-        insert_menu.addAction(self.section_action)
-        insert_menu.addAction(self.figure_action)
-        insert_menu.addAction(self.table_action)
-        insert_menu.addAction(self.bibliography_action)
-        insert_menu.addAction(self.equation_action)
-        insert_menu.addAction(self.list_action)
-        insert_menu.addAction(self.toc_action)
-        insert_menu.addAction(self.theorem_action)
-        insert_menu.addAction(self.code_action)
+        insert_menu.addActions(self._snippet_actions)
         insert_menu.addAction(self.add_figure_file_action)
 
         preview_menu = menu_bar.addMenu("Preview")
         preview_menu.addAction(self.compile_action)
         preview_menu.addAction(self.live_preview_action)
         preview_menu.addAction(self.open_pdf_action)
+        preview_menu.addSeparator()
+        preview_menu.addAction(self.rescan_compiler_action)
 
         help_menu = menu_bar.addMenu("Help")
         help_menu.addAction(self.project_help_action)
         help_menu.addAction(self.about_action)
         help_menu.addSeparator()
         help_menu.addAction(self.assistant_action)
-        menu_bar.setStyleSheet(
-            "QMenuBar { background: #ffffff; border-bottom: 1px solid #dbe2ec; }"
-            "QMenuBar::item { padding: 6px 10px; margin: 2px; }"
-            "QMenuBar::item:selected { background: #e9eef5; color: #0a66c2; border-radius: 6px; }"
-            "QMenu { background: #ffffff; border: 1px solid #dbe2ec; }"
-            "QMenu::item:selected { background: #e9eef5; color: #0a66c2; }"
-        )
         self.setMenuBar(menu_bar)
 
     def _create_toolbar(self) -> None:
@@ -666,58 +1251,27 @@ class EditorWindow(QMainWindow):
         toolbar.addAction(self.open_pdf_action)
         toolbar.addAction(self.search_action)
         toolbar.addSeparator()
-        toolbar.addAction(self.figure_action)
-        toolbar.addAction(self.table_action)
-        toolbar.addAction(self.bibliography_action)
-        toolbar.addAction(self.section_action)
-        toolbar.addAction(self.equation_action)
-        toolbar.addAction(self.list_action)
-        toolbar.addAction(self.toc_action)
-        toolbar.addAction(self.theorem_action)
-        toolbar.addAction(self.code_action)
+        toolbar.addActions(self._snippet_actions)
         toolbar.addSeparator()
         toolbar.addAction(self.about_action)
         toolbar.addAction(self.assistant_action)
         snippet_menu = QMenu("Insert Snippet", self)
-        for action in (
-            self.figure_action,
-            self.table_action,
-            self.bibliography_action,
-            self.section_action,
-            self.equation_action,
-            self.list_action,
-            self.toc_action,
-            self.theorem_action,
-            self.code_action,
-            self.add_figure_file_action,
-        ):
-            snippet_menu.addAction(action)
+        snippet_menu.addActions(self._snippet_actions)
+        snippet_menu.addAction(self.add_figure_file_action)
 
         snippet_button = QToolButton()
+        snippet_button.setObjectName("snippetButton")
         snippet_button.setText("Snippets")
         snippet_button.setMenu(snippet_menu)
         snippet_button.setPopupMode(QToolButton.InstantPopup)
-        snippet_button.setStyleSheet(
-            "QToolButton { background: #0a66c2; color: white; padding: 8px 12px;"
-            " border-radius: 8px; font-weight: 600; letter-spacing: 0.3px; }"
-            "QToolButton::menu-indicator { image: none; }"
-            "QToolButton:hover { background: #004182; }"
-        )
         toolbar.addWidget(snippet_button)
-
-        toolbar.setStyleSheet(
-            "QToolBar { background: #ffffff; spacing: 8px; padding: 8px; border-bottom: 1px solid #dbe2ec; }"
-            "QToolButton { color: #0b172a; padding: 7px 10px; border-radius: 8px; }"
-            "QToolButton:hover { background: #e9eef5; }"
-            "QToolButton:checked { background: #d7e7fb; color: #0a66c2; }"
-        )
         self.addToolBar(toolbar)
 
-    def _attach_editor_context(self, editor: QTextEdit) -> None:
+    def _attach_editor_context(self, editor: QPlainTextEdit) -> None:
         editor.setContextMenuPolicy(Qt.CustomContextMenu)
         editor.customContextMenuRequested.connect(lambda pos: self._show_context_menu(editor, pos))
 
-    def _show_context_menu(self, editor: QTextEdit, pos: QPoint) -> None:
+    def _show_context_menu(self, editor: QPlainTextEdit, pos: QPoint) -> None:
         menu = editor.createStandardContextMenu()
         menu.addSeparator()
         menu.addAction(self.compile_action)
@@ -727,18 +1281,7 @@ class EditorWindow(QMainWindow):
         menu.addAction(self.open_pdf_action)
 
         snippet_menu = QMenu("Insert snippet", self)
-        for action in (
-            self.section_action,
-            self.figure_action,
-            self.table_action,
-            self.equation_action,
-            self.list_action,
-            self.bibliography_action,
-            self.toc_action,
-            self.theorem_action,
-            self.code_action,
-        ):
-            snippet_menu.addAction(action)
+        snippet_menu.addActions(self._snippet_actions)
         menu.addMenu(snippet_menu)
         menu.exec(editor.mapToGlobal(pos))
 
@@ -746,18 +1289,25 @@ class EditorWindow(QMainWindow):
         filename = self.current_file.name if self.current_file else "Untitled.tex"
         self.setWindowTitle(f"PLATEX – {filename}")
 
-    def _current_editor(self) -> QTextEdit:
+    def _current_editor(self) -> QPlainTextEdit:
         widget = self.tabs.currentWidget()
-        assert isinstance(widget, QTextEdit)
+        assert isinstance(widget, QPlainTextEdit)
         return widget
 
     def _tab_path(self, index: int | None = None) -> Path | None:
-        idx = self.tabs.currentIndex() if index is None else index
-        data = self.tabs.tabBar().tabData(idx)
-        return Path(data) if data else None
+        widget = self.tabs.currentWidget() if index is None else self.tabs.widget(index)
+        return self._tab_paths.get(id(widget))
 
     def _set_tab_path(self, index: int, path: Path | None) -> None:
-        self.tabs.tabBar().setTabData(index, str(path) if path else None)
+        widget = self.tabs.widget(index)
+        previous = self._tab_paths.get(id(widget))
+        if previous:
+            self._tab_by_path.pop(str(previous), None)
+        if previous != path:
+            self._last_compiled_rev.pop(id(widget), None)
+        if path:
+            self._tab_by_path[str(path)] = widget
+        self._tab_paths[id(widget)] = path
         label = path.name if path else "Untitled.tex"
         self.tabs.setTabText(index, label)
         if index == self.tabs.currentIndex():
@@ -766,25 +1316,81 @@ class EditorWindow(QMainWindow):
 
     def _open_editor_tab(self, path: Path | None, content: str) -> None:
         if path:
-            for i in range(self.tabs.count()):
-                if self.tabs.tabBar().tabData(i) == str(path):
-                    self.tabs.setCurrentIndex(i)
-                    return
+            existing = self._tab_by_path.get(str(path))
+            if existing is not None:
+                self.tabs.setCurrentWidget(existing)
+                return
         editor = self._create_editor_widget()
-        editor.setPlainText(content)
+        head = len(content)
+        if head > _LOAD_HEAD_CHARS:
+            # Split after a newline so no line is broken across slices.
+            head = content.rfind("\n", 0, _LOAD_HEAD_CHARS) + 1 or _LOAD_HEAD_CHARS
+        self._set_editor_text(editor, content[:head])
         index = self.tabs.addTab(editor, path.name if path else "Untitled.tex")
         self._set_tab_path(index, path)
         self.tabs.setCurrentIndex(index)
+        if head < len(content):
+            # Read-only until complete: nothing typed can interleave with the
+            # appended text, and saves or builds never see half a file.
+            editor.loading = True  # type: ignore[attr-defined]
+            editor.setReadOnly(True)
+            editor.document().setUndoRedoEnabled(False)
+            QTimer.singleShot(0, lambda: self._append_loaded_text(editor, content, head))
+
+    def _append_loaded_text(self, editor: QPlainTextEdit, content: str, offset: int) -> None:
+        # The tab was closed or its text replaced while loading.
+        if not editor.loading or self.tabs.indexOf(editor) == -1:  # type: ignore[attr-defined]
+            return
+        end = min(len(content), offset + _LOAD_CHUNK_CHARS)
+        cursor = QTextCursor(editor.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        blocked = editor.blockSignals(True)
+        cursor.insertText(content[offset:end])
+        editor.blockSignals(blocked)
+        if end < len(content):
+            QTimer.singleShot(0, lambda: self._append_loaded_text(editor, content, end))
+            return
+        editor.loading = False  # type: ignore[attr-defined]
+        editor.setReadOnly(False)
+        editor.document().setUndoRedoEnabled(True)
+        editor.document().setModified(False)
+
+    @staticmethod
+    def _set_editor_text(editor: QPlainTextEdit, text: str) -> None:
+        # Replacing the whole buffer is not an edit: keep the change from
+        # arming the live-preview compile and skip repaints until the new
+        # text is laid out. The highlighter listens on the document, and a
+        # large load reaches it as one deferred pass.
+        blocked = editor.blockSignals(True)
+        editor.setUpdatesEnabled(False)
+        try:
+            editor.setPlainText(text)
+        finally:
+            editor.setUpdatesEnabled(True)
+            editor.blockSignals(blocked)
+        editor.document().setModified(False)
+        if editor.loading:  # type: ignore[attr-defined]
+            # Drop the rest of a file that was still streaming in.
+            editor.loading = False  # type: ignore[attr-defined]
+            editor.setReadOnly(False)
+            editor.document().setUndoRedoEnabled(True)
 
     def _tab_changed(self, index: int) -> None:
         self.current_file = self._tab_path(index)
         self._update_title()
+        self._schedule_search_highlights()
 
     def _close_tab(self, index: int) -> None:
+        if self._daemon_file is not None and self._tab_path(index) == self._daemon_file:
+            self._stop_latexmk_daemon()
         if self.tabs.count() == 1:
-            self.tabs.widget(index).setPlainText("")
+            self._set_editor_text(self.tabs.widget(index), "")
             self._set_tab_path(index, None)
             return
+        self._last_compiled_rev.pop(id(self.tabs.widget(index)), None)
+        path = self._tab_paths.pop(id(self.tabs.widget(index)), None)
+        if path:
+            self._tab_by_path.pop(str(path), None)
         self.tabs.removeTab(index)
         self.current_file = self._tab_path()
         self._update_title()
@@ -822,10 +1428,51 @@ class EditorWindow(QMainWindow):
         if path.is_file():
             self._load_file(path)
 
+    def _on_contents_change(self, editor: QPlainTextEdit, removed: int, added: int) -> None:
+        if not (removed or added):
+            return
+        editor.edit_serial += 1  # type: ignore[attr-defined]
+        if not editor.signalsBlocked():
+            self._schedule_live_preview()
+
     def _schedule_live_preview(self) -> None:
         if not self.live_preview_enabled:
             return
+        self.full_render_timer.stop()
+        if self.is_compiling or self.live_preview_timer.isActive():
+            self._recompile_pending = True
+            process = self.compile_proc
+            if (
+                process is not None
+                and self._compile_is_auto
+                and self._compile_killable
+                and not self.live_preview_timer.isActive()
+                and process.state() != QProcess.ProcessState.NotRunning
+            ):
+                # The running live build is for text that no longer exists.
+                # Stop it and let the guard absorb the rest of the burst; the
+                # follow-up build is left to finish, so the preview still
+                # moves while typing goes on.
+                self._compile_superseded = True
+                self._protect_next_live_build = True
+                process.kill()
+                self.live_preview_timer.start()
+            return
+        self._start_live_compile()
+
+    def _start_live_compile(self) -> None:
+        self._recompile_pending = False
+        self.full_render_timer.stop()
         self.live_preview_timer.start()
+        protect, self._protect_next_live_build = self._protect_next_live_build, False
+        self.compile_pdf(auto=True)
+        if protect and self.compile_proc is not None:
+            self._compile_killable = False
+
+    def _on_live_preview_guard(self) -> None:
+        # A build still running picks the pending edits up in _finish_compile.
+        if self._recompile_pending and not self.is_compiling:
+            self._start_live_compile()
 
     def _toggle_live_preview(self, enabled: bool) -> None:
         self.live_preview_enabled = enabled
@@ -899,6 +1546,7 @@ Welcome to your new PLATEX project. Add sections, figures, and more from the too
                 encoding="utf-8",
             )
 
+        self._stop_latexmk_daemon()
         self.project_root = target
         self._refresh_file_tree()
         self._load_file(main_tex)
@@ -910,67 +1558,39 @@ Welcome to your new PLATEX project. Add sections, figures, and more from the too
             return
 
         project_path = Path(target)
-        tex_files = list(project_path.glob("*.tex"))
-        if not tex_files:
+        # One pass over the folder; main.tex wins, otherwise the first .tex
+        # seen. DirEntry.is_file uses the type scandir already read.
+        main_tex: str | None = None
+        try:
+            with os.scandir(project_path) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".tex") or not entry.is_file():
+                        continue
+                    if entry.name == "main.tex":
+                        main_tex = entry.path
+                        break
+                    main_tex = main_tex or entry.path
+        except OSError as exc:
+            QMessageBox.critical(self, "Error", f"Failed to open folder: {exc}")
+            return
+        if main_tex is None:
             QMessageBox.information(self, "No TeX file", "That folder has no .tex files to open.")
             return
 
+        self._stop_latexmk_daemon()
         self.project_root = project_path
         self._refresh_file_tree()
-        self._load_file(tex_files[0])
+        self._load_file(Path(main_tex))
         self.status.showMessage(f"Opened project {project_path}", 3000)
 
     def new_from_template(self) -> None:
         if not self._confirm_discard_changes():
             return
 
-        templates = {
-            "Article": """\\documentclass{article}
-\\usepackage[utf8]{inputenc}
-\\usepackage{amsmath,amssymb}
-\\title{Your Title}
-\\author{Your Name}
-\\begin{document}
-\\maketitle
-
-\\section{Introduction}
-Start writing here.
-
-\\end{document}
-""",
-            "Report": """\\documentclass{report}
-\\usepackage[utf8]{inputenc}
-\\usepackage{graphicx}
-\\title{Project Report}
-\\author{Your Name}
-\\begin{document}
-\\maketitle
-
-\\chapter{Overview}
-Content goes here.
-
-\\end{document}
-""",
-            "Beamer": """\\documentclass{beamer}
-\\usetheme{Madrid}
-\\title{Your Talk}
-\\author{Your Name}
-\\begin{document}
-\\begin{frame}\titlepage\end{frame}
-\\begin{frame}{Agenda}
-  \begin{itemize}
-    \item Point 1
-    \item Point 2
-  \end{itemize}
-\\end{frame}
-\\end{document}
-""",
-        }
-
-        names = list(templates.keys())
+        names = list(_TEMPLATES.keys())
         name, ok = QInputDialog.getItem(self, "New from template", "Choose a starting point", names, 0, False)
-        if ok and name in templates:
-            self._open_editor_tab(None, templates[name])
+        if ok and name in _TEMPLATES:
+            self._open_editor_tab(None, _TEMPLATES[name])
             self.status.showMessage(f"Loaded {name} template", 2000)
 
     def open_file(self) -> None:
@@ -982,18 +1602,41 @@ Content goes here.
             self._load_file(Path(path))
 
     def _load_file(self, path: Path) -> None:
-        file = QFile(str(path))
-        if not file.open(QFile.ReadOnly | QFile.Text):
+        try:
+            content = self._read_text(path)
+        except OSError:
             QMessageBox.warning(self, "Error", f"Cannot open file: {path}")
             return
-        stream = QTextStream(file)
-        content = stream.readAll()
-        file.close()
         self._open_editor_tab(path, content)
         self.last_pdf_output = None
+        # Show the PDF from the last build right away instead of an empty pane
+        # until the first compile finishes.
+        pdf = path.with_suffix(".pdf")
+        if pdf.is_file():
+            self.last_pdf_output = pdf
+            self._load_preview(pdf)
         self.status.showMessage(f"Opened {path}", 2000)
 
+    def save_file_as(self) -> None:
+        self.save_file(save_as=True)
+
+    @staticmethod
+    def _read_text(path: Path) -> str:
+        with open(path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < 64 * 1024:
+                data = handle.read()
+            else:
+                # Decode straight out of the page cache instead of copying the
+                # file into a bytes object first.
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    return str(view, "utf-8", "replace").replace("\r\n", "\n")
+        return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
     def save_file(self, save_as: bool = False) -> None:
+        if self._current_editor().loading:  # type: ignore[attr-defined]
+            self.status.showMessage("Still loading the file – try again in a moment", 3000)
+            return
         if save_as or not self.current_file:
             default_dir = str(self.project_root) if self.project_root else ""
             path, _ = QFileDialog.getSaveFileName(
@@ -1008,13 +1651,81 @@ Content goes here.
 
         assert self.current_file is not None
         editor = self._current_editor()
+        data = editor.toPlainText().encode("utf-8")
+        key = str(self.current_file)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
         try:
-            with open(self.current_file, "w", encoding="utf-8") as handle:
-                handle.write(editor.toPlainText())
-            self.status.showMessage(f"Saved to {self.current_file}", 2000)
-            self._set_tab_path(self.tabs.currentIndex(), self.current_file)
-        except OSError as exc:
-            QMessageBox.critical(self, "Error", f"Failed to save file: {exc}")
+            stat = self.current_file.stat()
+            on_disk = (digest, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            on_disk = None
+        if on_disk is None or self._saved_state.get(key) != on_disk:
+            # QSaveFile writes to a temporary file and renames it on commit(),
+            # so a crash mid-save never leaves a truncated .tex behind.
+            target = QSaveFile(key)
+            if not (target.open(QIODevice.WriteOnly) and target.write(data) != -1 and target.commit()):
+                error = target.errorString()
+                target.cancelWriting()
+                QMessageBox.critical(self, "Error", f"Failed to save file: {error}")
+                return
+            stat = self.current_file.stat()
+            # Remember what we wrote; an identical buffer over an untouched
+            # file (typical before a compile) then skips the disk write.
+            self._saved_state[key] = (digest, stat.st_mtime_ns, stat.st_size)
+        self.status.showMessage(f"Saved to {self.current_file}", 2000)
+        self._set_tab_path(self.tabs.currentIndex(), self.current_file)
+
+    @staticmethod
+    def _shadow_dir_for(tex_file: Path) -> Path:
+        name = hashlib.blake2b(str(tex_file).encode("utf-8"), digest_size=8).hexdigest()
+        return Path(tempfile.gettempdir()) / "platex" / name
+
+    @staticmethod
+    def _buffer_digest(editor: QPlainTextEdit) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        block = editor.document().firstBlock()
+        while block.isValid():
+            digest.update(block.text().encode("utf-8"))
+            digest.update(b"\n")
+            block = block.next()
+        return digest.digest()
+
+    @staticmethod
+    def _dump_editor_to(path: Path, editor: QPlainTextEdit) -> None:
+        # Write beside the target and rename over it: the latexmk daemon polls
+        # the file and must never pick up a half-written copy.
+        partial = path.with_name(path.name + ".part")
+        block = editor.document().firstBlock()
+        with open(partial, "w", encoding="utf-8") as handle:
+            while block.isValid():
+                handle.write(block.text())
+                block = block.next()
+                if block.isValid():
+                    handle.write("\n")
+        os.replace(partial, path)
+
+    @staticmethod
+    def _mirror_output_dirs(shadow: Path, project_dir: Path, editor: QPlainTextEdit) -> None:
+        # \include{chapters/ch1} makes TeX write chapters/ch1.aux inside the
+        # output directory, and TeX does not create missing folders. Mirror
+        # the project's top-level folders plus those named by \include.
+        names: set[str] = set()
+        try:
+            with os.scandir(project_dir) as entries:
+                names.update(entry.name for entry in entries if entry.is_dir() and not entry.name.startswith("."))
+        except OSError:
+            pass
+        document = editor.document()
+        found = document.find(_INCLUDE_QRE)
+        while not found.isNull():
+            block = found.block()
+            for match in _INCLUDE_ARG_RE.finditer(block.text().split("%", 1)[0]):
+                parent = Path(match.group(1).strip()).parent
+                if not parent.is_absolute() and ".." not in parent.parts:
+                    names.add(parent.as_posix())
+            found = document.find(_INCLUDE_QRE, block.position() + block.length())
+        for name in names - {"."}:
+            (shadow / name).mkdir(parents=True, exist_ok=True)
 
     def _confirm_discard_changes(self) -> bool:
         reply = QMessageBox.question(
@@ -1025,9 +1736,40 @@ Content goes here.
         )
         return reply == QMessageBox.Yes
 
-    def compile_pdf(self, auto: bool = False) -> None:
+    def compile_pdf(self, auto: bool = False, draft: bool | None = None) -> None:
+        """Build the current file; live-preview builds default to a draft pass.
+
+        A draft pass only typesets (``-draftmode``/``-no-pdf``) to surface errors
+        cheaply; the PDF is produced by a full pass once typing pauses.
+        """
+        if draft is None:
+            draft = auto
         if self.is_compiling:
+            if not auto and self._compile_is_auto and self.compile_proc is not None:
+                # An explicit build outranks a live one: stop the live pass
+                # and run this build as soon as it is gone.
+                self._manual_compile_pending = True
+                self._compile_superseded = True
+                self.compile_proc.kill()
             return
+        editor = self._current_editor()
+        if auto and editor.loading:  # type: ignore[attr-defined]
+            return
+        revision = editor.edit_serial  # type: ignore[attr-defined]
+        digest = None
+        last = self._last_compiled_rev.get(id(editor))
+        if auto and self.current_file and last and (last[2] or draft):
+            # Nothing was typed since the last good build of this buffer.
+            if last[0] == revision:
+                return
+            # Edits that cancel out (undo/redo, retyping a word) bump the
+            # serial but leave the same text behind.
+            digest = self._buffer_digest(editor)
+            if digest == last[1]:
+                self._last_compiled_rev[id(editor)] = (revision, digest, last[2])
+                return
+        if digest is None:
+            digest = self._buffer_digest(editor)
         self.is_compiling = True
         if not self.current_file:
             base = self.project_root or Path.home() / "PLATEX"
@@ -1035,96 +1777,455 @@ Content goes here.
             self.current_file = base / "main.tex"
 
         assert self.current_file is not None
-        self.save_file()
+        if not auto:
+            self.save_file()
         tex_file = self.current_file
-        pdf_output = tex_file.with_suffix(".pdf")
-        self.last_pdf_output = pdf_output
 
         command = self._detect_compiler()
         if not command:
-            self.status.showMessage("Preparing LaTeX toolchain…", 4000)
-            command = self._install_toolchain()
-        if not command:
-            if not auto:
-                QMessageBox.warning(
-                    self,
-                    "Compiler missing",
-                    "No LaTeX compiler was found or could be installed automatically.\n"
-                    "Please install TeX Live (macOS/Linux) or MiKTeX (Windows) and try again.",
-                )
             self.is_compiling = False
+            if self._install_runner is not None:
+                self.status.showMessage("Still installing the LaTeX toolchain…", 3000)
+            elif not self._install_toolchain(auto):
+                self._warn_compiler_missing(auto)
             return
 
         if not auto:
             self.status.showMessage("Compiling…", 2000)
-        env = os.environ.copy()
-        env.setdefault("MIKTEX_AUTOINSTALL", "1")
-        env.setdefault("MIKTEX_ON_THE_FLY", "1")
+        env = self._live_env if auto else self._compile_env
 
         cmd_name = Path(command).name.lower()
-        compile_cmd = [command, "-interaction=nonstopmode", str(tex_file.name if tex_file.parent else tex_file)]
+        # Live builds feed the long-lived latexmk; an explicit compile runs its
+        # own latexmk so it always rebuilds, even for an unchanged file.
+        use_daemon = auto and "latexmk" in cmd_name
+        # Live builds go to a shadow copy so the user's file and project folder
+        # are only written on an explicit save. The compiler still runs in the
+        # project folder, so \input and \includegraphics resolve as usual;
+        # only its outputs are redirected.
+        shadow = self._shadow_dir_for(tex_file)
+        source = shadow / tex_file.name if auto else tex_file
+        if auto:
+            # Live preview fires on every pause in typing; stream the blocks to
+            # disk instead of materialising the whole document as one string.
+            try:
+                shadow.mkdir(parents=True, exist_ok=True)
+                self._mirror_output_dirs(shadow, tex_file.parent, editor)
+                self._dump_editor_to(source, editor)
+            except OSError as exc:
+                self.status.showMessage(f"Live preview could not save: {exc}", 4000)
+                self.is_compiling = False
+                return
+            self._set_tab_path(self.tabs.currentIndex(), tex_file)
+        pdf_output = (shadow if source != tex_file else tex_file.parent) / f"{tex_file.stem}.pdf"
+        self.last_pdf_output = pdf_output
+
+        if use_daemon:
+            # A long-lived ``latexmk -pvc`` notices the shadow copy we just
+            # wrote and rebuilds it, so start-up is paid only once.
+            self._ensure_latexmk_daemon(command, tex_file, source, env, editor)
+            self._last_compiled_rev[id(editor)] = (revision, digest, True)
+            self.is_compiling = False
+            return
+
+        # A draft pass only has to check this buffer: skip the \include'd
+        # chapters, which keep their labels and page numbers from the .aux
+        # files of the last full build. The full render still typesets them.
+        skip_chapters = draft and not editor.document().find(_INCLUDE_QRE).isNull()
+        fmt_args: list[str] = []
+        # A dumped preamble format changes how the file's preamble is read,
+        # so it is not combined with the \includeonly wrapper.
+        if "pdflatex" in cmd_name and not skip_chapters:
+            env = QProcessEnvironment(env)
+            formats = env.value("TEXFORMATS", "")
+            env.insert("TEXFORMATS", f"{shadow}{os.pathsep}{formats}")
+            fmt_args = self._preamble_format_args(command, source, tex_file, shadow, editor, env, dump=not draft)
+        target = [str(source)] if source != tex_file else [tex_file.name]
+        if source != tex_file:
+            target.insert(0, f"-output-directory={shadow}")
+        if skip_chapters:
+            path = Path(target[-1]).as_posix()
+            target[-1:] = [f"-jobname={tex_file.stem}", f'\\includeonly{{}}\\input{{"{path}"}}']
+        compile_cmd = [command, *fmt_args, "-interaction=nonstopmode", *target]
         if "latexmk" in cmd_name:
-            compile_cmd = [command, "-pdf", "-interaction=nonstopmode", "-halt-on-error", tex_file.name]
+            # -g: rebuild even when latexmk finds nothing changed on disk, e.g.
+            # after a missing package was installed.
+            compile_cmd = [command, "-pdf", "-g", "-interaction=nonstopmode", "-halt-on-error", *target]
+        elif draft:
+            draft_flag = "-no-pdf" if "xelatex" in cmd_name else "-draftmode"
+            compile_cmd = [command, *fmt_args, draft_flag, "-interaction=nonstopmode", "-halt-on-error", *target]
+
+        # Run the build in a QProcess so the event loop (typing, tab switches,
+        # status updates) keeps going while LaTeX works.
+        process = QProcess(self)
+        process.setWorkingDirectory(str(tex_file.parent))
+        process.setProcessEnvironment(env)
+        process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        process.readyReadStandardOutput.connect(lambda: self._on_compile_output(process))
+        process.finished.connect(
+            lambda exit_code, exit_status: self._on_compile_finished(
+                process, exit_code, exit_status, pdf_output, auto, draft, editor, (revision, digest)
+            )
+        )
+        process.errorOccurred.connect(lambda error: self._on_compile_error(process, error, auto))
+        timeout = QTimer(process)
+        timeout.setSingleShot(True)
+        timeout.timeout.connect(lambda: self._on_compile_timeout(process))
+        self.compile_proc = process
+        self._compile_timed_out = False
+        self._compile_log = bytearray()
+        self._compile_log_marks = []
+        self._compile_is_auto = auto
+        self._compile_superseded = False
+        self._compile_killable = True
+        self._compile_clock.start()
+        if not auto:
+            self.compile_action.setEnabled(False)
+        process.start(command, compile_cmd[1:])
+        timeout.start(60_000)
+
+    def _ensure_latexmk_daemon(
+        self, command: str, tex_file: Path, source: Path, env: QProcessEnvironment, editor: QPlainTextEdit
+    ) -> None:
+        daemon = self.latexmk_daemon
+        if (
+            daemon is not None
+            and self._daemon_file == tex_file
+            and daemon.state() != QProcess.ProcessState.NotRunning
+        ):
+            return
+        self._stop_latexmk_daemon()
+
+        daemon = QProcess(self)
+        daemon.setWorkingDirectory(str(tex_file.parent))
+        daemon.setProcessEnvironment(env)
+        daemon.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        daemon.readyRead.connect(self._on_daemon_output)
+        daemon.errorOccurred.connect(lambda error: self._on_daemon_error(daemon, error))
+        daemon.finished.connect(lambda *_: self._on_daemon_finished(daemon))
+        self.latexmk_daemon = daemon
+        self._daemon_file = tex_file
+        self._daemon_editor = editor
+        self._daemon_log = b""
+        daemon.start(
+            command,
+            [
+                "-pvc",
+                "-view=none",
+                "-pdf",
+                "-interaction=nonstopmode",
+                "-halt-on-error",
+                f"-outdir={source.parent}",
+                "-e",
+                "$sleep_time = 1",
+                str(source),
+            ],
+        )
 
-        try:
-            result = subprocess.run(
-                compile_cmd,
-                cwd=tex_file.parent,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                timeout=60,
-                check=False,
-                env=env,
+    def _stop_latexmk_daemon(self) -> None:
+        daemon = self.latexmk_daemon
+        self.latexmk_daemon = None
+        self._daemon_file = None
+        self._daemon_editor = None
+        self._daemon_log = b""
+        if daemon is None:
+            return
+        if daemon.state() != QProcess.ProcessState.NotRunning:
+            daemon.kill()
+            daemon.waitForFinished(1000)
+        daemon.deleteLater()
+
+    def _on_daemon_output(self) -> None:
+        daemon = self.latexmk_daemon
+        if daemon is None:
+            return
+        self._daemon_log += bytes(daemon.readAll())
+        # latexmk prints this banner after every build cycle.
+        marker = b"=== Watching for updated files"
+        index = self._daemon_log.find(marker)
+        while index != -1:
+            cycle = self._daemon_log[:index].decode("utf-8", errors="replace")
+            line_end = self._daemon_log.find(b"\n", index)
+            self._daemon_log = self._daemon_log[line_end + 1 :] if line_end != -1 else b""
+            self._on_daemon_cycle(cycle)
+            index = self._daemon_log.find(marker)
+
+    def _on_daemon_cycle(self, log: str) -> None:
+        if self._daemon_file is None:
+            return
+        pdf_output = self._shadow_dir_for(self._daemon_file) / f"{self._daemon_file.stem}.pdf"
+        if "Latexmk: Errors" in log or "Collected error summary" in log or not pdf_output.exists():
+            self._show_compile_errors(log or "Compilation failed without output", self._daemon_editor)
+            self.status.showMessage("Compilation failed – see error pane", 4000)
+            return
+        self.last_pdf_output = pdf_output
+        self.status.showMessage("Compilation successful (preview refreshed)", 2000)
+        self._clear_error_marks(self._daemon_editor)
+        self._load_preview(pdf_output)
+
+    def _on_daemon_error(self, daemon: QProcess, error: QProcess.ProcessError) -> None:
+        if error == QProcess.ProcessError.FailedToStart and daemon is self.latexmk_daemon:
+            self.status.showMessage(f"Failed to run latexmk: {daemon.errorString()}", 4000)
+            self._stop_latexmk_daemon()
+
+    def _on_daemon_finished(self, daemon: QProcess) -> None:
+        if daemon is self.latexmk_daemon:
+            self.status.showMessage("latexmk watcher stopped – compile again to restart it", 4000)
+            self.latexmk_daemon = None
+            self._daemon_file = None
+            self._daemon_editor = None
+            daemon.deleteLater()
+
+    @staticmethod
+    def _preamble_digest(editor: QPlainTextEdit) -> bytes | None:
+        digest = hashlib.blake2b(digest_size=16)
+        block = editor.document().firstBlock()
+        while block.isValid():
+            text = block.text()
+            end = text.find("\\begin{document}")
+            if end != -1:
+                digest.update(text[:end].encode("utf-8"))
+                return digest.digest()
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\n")
+            block = block.next()
+        return None
+
+    def _preamble_format_args(
+        self,
+        command: str,
+        source: Path,
+        tex_file: Path,
+        shadow: Path,
+        editor: QPlainTextEdit,
+        env: QProcessEnvironment,
+        dump: bool = True,
+    ) -> list[str]:
+        """Return ``-fmt`` arguments if a format for the current preamble exists.
+
+        Loading a dumped format skips re-reading every ``\\usepackage``. When
+        ``dump`` is set, a missing or stale format is rebuilt in the background
+        (into the shadow directory); this build runs without one. Draft passes
+        pass ``dump=False`` so typing in the preamble does not start a dump
+        per keystroke burst; the full render after a pause does it once.
+        """
+        digest = self._preamble_digest(editor)
+        if digest is None:
+            return []
+        key = str(tex_file)
+        jobname = f"{tex_file.stem}-preamble"
+        fmt_file = shadow / f"{jobname}.fmt"
+        if self._preamble_formats.get(key) == digest and fmt_file.exists():
+            return [f"-fmt={jobname}"]
+        if dump and self._format_proc is None and (key, digest) not in self._format_unavailable:
+            shadow.mkdir(parents=True, exist_ok=True)
+            process = QProcess(self)
+            process.setWorkingDirectory(str(tex_file.parent))
+            process.setProcessEnvironment(env)
+            process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+            process.finished.connect(
+                lambda exit_code, exit_status: self._on_format_finished(
+                    process, key, digest, fmt_file, exit_status == QProcess.ExitStatus.NormalExit and exit_code == 0
+                )
             )
-        except subprocess.TimeoutExpired:
-            if not auto:
-                QMessageBox.critical(self, "Timeout", "Compilation took too long and was stopped.")
-            self.is_compiling = False
+            process.errorOccurred.connect(
+                lambda error: self._on_format_finished(process, key, digest, fmt_file, False)
+                if error == QProcess.ProcessError.FailedToStart
+                else None
+            )
+            self._format_proc = process
+            # The dump overwrites the one .fmt per file in place, so the
+            # format built for the previous preamble is gone from here on.
+            self._preamble_formats.pop(key, None)
+            process.start(
+                command,
+                [
+                    "-ini",
+                    "-interaction=nonstopmode",
+                    f"-jobname={jobname}",
+                    f"-output-directory={shadow}",
+                    "&pdflatex",
+                    "mylatexformat.ltx",
+                    str(source) if source != tex_file else tex_file.name,
+                ],
+            )
+        return []
+
+    def _on_format_finished(
+        self, process: QProcess, key: str, digest: bytes, fmt_file: Path, succeeded: bool
+    ) -> None:
+        if process is not self._format_proc:
             return
-        except OSError as exc:
+        self._format_proc = None
+        process.deleteLater()
+        if succeeded and fmt_file.exists():
+            self._preamble_formats[key] = digest
+        else:
+            # mylatexformat missing or the preamble cannot be dumped; do not
+            # retry until the preamble changes. \dump may already have
+            # written part of a format, which no preamble can load.
+            self._format_unavailable.add((key, digest))
+            fmt_file.unlink(missing_ok=True)
+
+    def _on_compile_output(self, process: QProcess) -> None:
+        # Drain the pipe as output arrives instead of letting QProcess buffer
+        # the whole log (nonstopmode runs can print megabytes).
+        if process is not self.compile_proc:
+            return
+        self._compile_log += bytes(process.readAllStandardOutput())
+        overflow = len(self._compile_log) - _COMPILE_LOG_BYTES
+        if overflow <= 0:
+            return
+        # Cut on a line boundary so no "l.N" mark is split in half.
+        cut = self._compile_log.find(b"\n", overflow) + 1 or overflow
+        dropped = self._compile_log[:cut].decode("utf-8", errors="replace")
+        del self._compile_log[:cut]
+        self._compile_log_marks.extend(int(match.group(1)) for match in _LATEX_ERR_RE.finditer(dropped))
+
+    def _on_compile_timeout(self, process: QProcess) -> None:
+        if process is self.compile_proc and process.state() != QProcess.ProcessState.NotRunning:
+            self._compile_timed_out = True
+            process.kill()
+
+    def _on_compile_error(self, process: QProcess, error: QProcess.ProcessError, auto: bool) -> None:
+        # Crashes (including our own kills) still emit finished().
+        if error != QProcess.ProcessError.FailedToStart or process is not self.compile_proc:
+            return
+        if not auto:
+            QMessageBox.critical(self, "Error", f"Failed to run compiler: {process.errorString()}")
+        self._finish_compile(process)
+
+    def _on_compile_finished(
+        self,
+        process: QProcess,
+        exit_code: int,
+        exit_status: QProcess.ExitStatus,
+        pdf_output: Path,
+        auto: bool,
+        draft: bool,
+        editor: QPlainTextEdit,
+        revision: tuple[int, bytes],
+    ) -> None:
+        if process is not self.compile_proc:
+            return
+        if self._compile_superseded:
+            self._finish_compile(process)
+            return
+        if self._compile_timed_out:
             if not auto:
-                QMessageBox.critical(self, "Error", f"Failed to run compiler: {exc}")
-            self.is_compiling = False
+                QMessageBox.critical(self, "Timeout", "Compilation took too long and was stopped.")
+            self._finish_compile(process)
             return
 
-        if result.returncode == 0 and pdf_output.exists():
+        if auto and draft:
+            elapsed = self._compile_clock.elapsed()
+            self.live_preview_timer.setInterval(max(600, min(4000, 2 * elapsed)))
+        self._on_compile_output(process)
+        log = self._compile_log.decode("utf-8", errors="replace")
+        succeeded = exit_status == QProcess.ExitStatus.NormalExit and exit_code == 0
+        if succeeded and (draft or pdf_output.exists()):
+            self._last_compiled_rev[id(editor)] = (revision[0], revision[1], not draft)
+        if succeeded and draft:
+            self._clear_error_marks(editor)
+            self.status.showMessage("Live check passed – preview refreshes when you pause", 2000)
+            self.full_render_timer.start()
+        elif succeeded and pdf_output.exists():
             self.status.showMessage("Compilation successful (preview refreshed)", 2000)
-            self._clear_error_marks()
+            self._clear_error_marks(editor)
             self._load_preview(pdf_output)
         else:
-            self._show_compile_errors(result.stdout or "Compilation failed without output")
+            self._show_compile_errors(log or "Compilation failed without output", editor, self._compile_log_marks)
             if not auto:
                 self.status.showMessage("Compilation failed – see error pane", 4000)
             else:
                 self.status.showMessage("Live preview compile failed – see error pane", 4000)
+        self._finish_compile(process)
+
+    def _finish_compile(self, process: QProcess) -> None:
+        self.compile_proc = None
         self.is_compiling = False
+        self.compile_action.setEnabled(True)
+        process.deleteLater()
+        if self._manual_compile_pending:
+            # Pending live edits follow once this build is done.
+            self._manual_compile_pending = False
+            QTimer.singleShot(0, self.compile_pdf)
+            return
+        # While the guard runs, _on_live_preview_guard starts the follow-up.
+        if self._recompile_pending and not self.live_preview_timer.isActive():
+            QTimer.singleShot(0, self._start_live_compile)
 
     def _load_preview(self, pdf_output: Path) -> None:
-        load_status = self.preview_document.load(str(pdf_output))
-        if load_status == QPdfDocument.Status.Ready:
+        try:
+            stat = pdf_output.stat()
+        except OSError:
+            stat = None
+        key = (str(pdf_output), stat.st_mtime_ns, stat.st_size) if stat else None
+        if (
+            key is not None
+            and key == self._last_pdf_stat
+            and self.preview_document.status() == QPdfDocument.Status.Ready
+        ):
+            # Same bytes as last time (e.g. a live-preview pass that wrote
+            # nothing new): skip re-parsing the PDF.
+            self.preview_stack.setCurrentWidget(self.preview)
+            return
+
+        # Load from an in-memory snapshot: the next build rewrites the PDF in
+        # place, and pages rendered later must not read a half-written file.
+        try:
+            data = pdf_output.read_bytes()
+        except OSError:
+            data = b""
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == self._last_pdf_digest and self.preview_document.status() == QPdfDocument.Status.Ready:
+            # Rewritten but byte-identical (an edit to a comment, say): keep
+            # the loaded document and the pages QPdfView already rendered.
+            self._last_pdf_stat = key
+            self.preview_stack.setCurrentWidget(self.preview)
+            return
+
+        # Reloading resets the view to page one; keep the reader's place.
+        vertical = self.preview.verticalScrollBar().value()
+        horizontal = self.preview.horizontalScrollBar().value()
+        buffer = QBuffer(self)
+        buffer.setData(QByteArray(data))
+        buffer.open(QIODevice.ReadOnly)
+        self.preview_document.load(buffer)
+        previous, self._pdf_buffer = self._pdf_buffer, buffer
+        if previous is not None:
+            previous.close()
+            previous.deleteLater()
+        if self.preview_document.status() == QPdfDocument.Status.Ready:
+            self._last_pdf_stat = key
+            self._last_pdf_digest = digest
             self.preview.setPageMode(QPdfView.PageMode.MultiPage)
             self.preview_stack.setCurrentWidget(self.preview)
+            self.preview.verticalScrollBar().setValue(vertical)
+            self.preview.horizontalScrollBar().setValue(horizontal)
             self.preview.update()
             return
+        self._last_pdf_stat = None
+        self._last_pdf_digest = None
         self.status.showMessage("Preview unavailable – PDF saved to disk", 4000)
 
-    def _show_compile_errors(self, log: str) -> None:
-        self.preview_errors.setPlainText(log)
+    def _show_compile_errors(
+        self, log: str, editor: QPlainTextEdit | None, earlier_lines: list[int] | None = None
+    ) -> None:
+        if len(log) > _ERROR_PANE_CHARS:
+            self.preview_errors.setPlainText("…\n" + log[-_ERROR_PANE_CHARS:])
+        else:
+            self.preview_errors.setPlainText(log)
         self.preview_stack.setCurrentWidget(self.preview_errors)
 
-        line_numbers: list[int] = []
-        for line in log.splitlines():
-            match = re.search(r"l\.(\d+)", line)
-            if match:
-                try:
-                    line_numbers.append(int(match.group(1)))
-                except ValueError:
-                    continue
-        self._mark_error_lines(line_numbers)
+        line_numbers = list(earlier_lines or [])
+        line_numbers += [int(match.group(1)) for match in _LATEX_ERR_RE.finditer(log)]
+        self._mark_error_lines(editor, line_numbers)
 
-    def _mark_error_lines(self, lines: list[int]) -> None:
-        editor = self._current_editor()
+    def _mark_error_lines(self, editor: QPlainTextEdit | None, lines: list[int]) -> None:
+        # Line numbers belong to the buffer that was built, which may no
+        # longer be the current tab; skip it if that tab has been closed.
+        if editor is None or self.tabs.indexOf(editor) == -1:
+            return
         selections: list[QTextEdit.ExtraSelection] = []
         if lines:
             error_format = QTextCharFormat()
@@ -1142,11 +2243,11 @@ Content goes here.
                 selections.append(selection)
         editor.setExtraSelections(selections)
 
-    def _clear_error_marks(self) -> None:
+    def _clear_error_marks(self, editor: QPlainTextEdit | None) -> None:
         self.preview_errors.clear()
         self.preview_stack.setCurrentWidget(self.preview)
-        editor = self._current_editor()
-        editor.setExtraSelections([])
+        if editor is not None and self.tabs.indexOf(editor) != -1:
+            editor.setExtraSelections([])
 
     def open_pdf_externally(self) -> None:
         if not self.last_pdf_output or not self.last_pdf_output.exists():
@@ -1169,18 +2270,41 @@ Content goes here.
             QMessageBox.warning(self, "Open file", f"Could not open file: {exc}")
 
     def _detect_compiler(self) -> str | None:
+        # Live preview calls this on every build; only walk PATH again if the
+        # remembered binary has gone away.
+        if self._compiler_cache and Path(self._compiler_cache).exists():
+            return self._compiler_cache
+        self._compiler_cache = None
         for candidate in ("latexmk", "pdflatex", "xelatex"):
             path = shutil.which(candidate)
             if path:
+                self._compiler_cache = path
                 return path
         return None
 
-    def _install_toolchain(self) -> str | None:
-        """Best-effort, unattended installation of a LaTeX toolchain."""
+    def rescan_compiler(self) -> None:
+        """Forget the cached compiler, e.g. after installing TeX by hand."""
+        self._compiler_cache = None
+        command = self._detect_compiler()
+        if command:
+            self.status.showMessage(f"Using {command}", 4000)
+        else:
+            self.status.showMessage("No LaTeX compiler found on PATH", 4000)
+
+    def _warn_compiler_missing(self, auto: bool) -> None:
+        if auto:
+            return
+        QMessageBox.warning(
+            self,
+            "Compiler missing",
+            "No LaTeX compiler was found or could be installed automatically.\n"
+            "Please install TeX Live (macOS/Linux) or MiKTeX (Windows) and try again.",
+        )
+
+    def _toolchain_install_commands(self) -> tuple[str, list[list[str]]]:
         if sys.platform.startswith("win"):
             if shutil.which("winget"):
-                self.status.showMessage("Installing MiKTeX via winget…", 4000)
-                subprocess.run(
+                return "Installing MiKTeX via winget…", [
                     [
                         "winget",
                         "install",
@@ -1191,110 +2315,96 @@ Content goes here.
                         "--accept-package-agreements",
                         "--accept-source-agreements",
                     ],
-                    check=False,
-                )
-                subprocess.run(["initexmf", "--mklinks", "--force"], check=False)
-                subprocess.run(["mpm", "--admin", "--update-db"], check=False)
-                subprocess.run(["mpm", "--admin", "--install=collection-latexrecommended"], check=False)
-            else:
-                QMessageBox.information(
-                    self,
-                    "Install MiKTeX",
-                    "Please install MiKTeX from https://miktex.org/download to compile locally.",
-                )
+                    ["initexmf", "--mklinks", "--force"],
+                    ["mpm", "--admin", "--update-db"],
+                    ["mpm", "--admin", "--install=collection-latexrecommended"],
+                ]
+            QMessageBox.information(
+                self,
+                "Install MiKTeX",
+                "Please install MiKTeX from https://miktex.org/download to compile locally.",
+            )
         elif sys.platform.startswith("darwin"):
             if shutil.which("brew"):
-                self.status.showMessage("Installing BasicTeX via Homebrew…", 4000)
-                subprocess.run(["brew", "install", "--cask", "basictex"], check=False)
-                subprocess.run(["sudo", "/Library/TeX/texbin/tlmgr", "option", "repository", "https://mirror.ctan.org/systems/texlive/tlnet"], check=False)
-                subprocess.run(["sudo", "/Library/TeX/texbin/tlmgr", "update", "--self", "--all"], check=False)
-                subprocess.run(["sudo", "/Library/TeX/texbin/tlmgr", "install", "latexmk"], check=False)
+                return "Installing BasicTeX via Homebrew…", [
+                    ["brew", "install", "--cask", "basictex"],
+                    ["sudo", "/Library/TeX/texbin/tlmgr", "option", "repository", "https://mirror.ctan.org/systems/texlive/tlnet"],
+                    ["sudo", "/Library/TeX/texbin/tlmgr", "update", "--self", "--all"],
+                    ["sudo", "/Library/TeX/texbin/tlmgr", "install", "latexmk"],
+                ]
         else:
             if shutil.which("apt-get"):
-                self.status.showMessage("Installing TeX Live (this may take a few minutes)…", 4000)
-                subprocess.run(["sudo", "apt-get", "update"], check=False)
-                subprocess.run(["sudo", "apt-get", "install", "-y", "texlive-full", "latexmk"], check=False)
+                return "Installing TeX Live (this may take a few minutes)…", [
+                    ["sudo", "apt-get", "update"],
+                    ["sudo", "apt-get", "install", "-y", "texlive-full", "latexmk"],
+                ]
+        return "", []
+
+    def _install_toolchain(self, auto: bool) -> bool:
+        """Best-effort, unattended installation of a LaTeX toolchain.
+
+        The installers run for minutes, so they are chained through QProcess
+        and the compile that asked for them is retried once they finish.
+        Returns ``False`` if there is nothing we know how to install.
+        """
+        label, commands = self._toolchain_install_commands()
+        if not commands:
+            return False
+
+        progress = QProgressDialog(label, "Cancel", 0, 0, self)
+        progress.setWindowTitle("Preparing LaTeX toolchain")
+        # Non-modal: the user can keep editing while TeX installs.
+        progress.setWindowModality(Qt.NonModal)
+        progress.setMinimumDuration(0)
+
+        def on_output(line: str) -> None:
+            self.status.showMessage(line[:160])
+
+        def on_done() -> None:
+            cancelled = progress.wasCanceled()
+            progress.close()
+            self._install_runner.deleteLater()
+            self._install_runner = None
+            self.status.clearMessage()
+            if cancelled:
+                self.status.showMessage("LaTeX toolchain installation cancelled", 3000)
+                return
+            self._compiler_cache = None
+            if self._detect_compiler():
+                self.compile_pdf(auto=auto)
+            else:
+                self._warn_compiler_missing(auto)
 
-        return self._detect_compiler()
+        self._install_runner = AsyncCmdRunner(self, commands, on_output, on_done)
+        progress.canceled.connect(self._install_runner.cancel)
+        self.status.showMessage(label, 4000)
+        self._install_runner.start()
+        return True
 
     def insert_snippet(self, kind: str) -> None:
-        snippets = {
-            "figure": """\\begin{figure}[h]
-  \centering
-  \includegraphics[width=0.8\\linewidth]{example-image}
-  \caption{Caption text}
-  \label{fig:label}
-\\end{figure}
-
-""",
-            "table": """\\begin{table}[h]
-  \centering
-  \begin{tabular}{lll}
-    \hline
-    A & B & C \\
-    \hline
-    1 & 2 & 3 \\
-    4 & 5 & 6 \\
-    \hline
-  \end{tabular}
-  \caption{Table caption}
-  \label{tab:label}
-\\end{table}
-
-""",
-            "bibliography": """% Add this near the end of your document
-\\bibliographystyle{plain}
-\\bibliography{references}
-
-% Example .bib entry
-% @article{key,
-%   title={Example},
-%   author={Author, A.},
-%   journal={Journal},
-%   year={2024}
-% }
-""",
-            "section": """\\section{New Section}
-Write your section text here.
-
-""",
-            "equation": """\\begin{equation}
-E = mc^2
-\\end{equation}
-
-""",
-            "list": """\\begin{itemize}
-  \item First item
-  \item Second item
-\\end{itemize}
-
-""",
-            "toc": """% Table of contents
-\\tableofcontents
-\\newpage
-
-""",
-            "theorem": """% Add to preamble: \\usepackage{amsthm}
-\\begin{theorem}[Sample]
-Let a, b \in \mathbb{R}. Then a + b = b + a.
-\\end{theorem}
-
-""",
-            "code": """% Add to preamble: \\usepackage{listings}
-\\begin{lstlisting}[language=Python, caption={Example code}]
-def hello():
-    print("Hello, PLATEX!")
-\\end{lstlisting}
-
-""",
-        } 
-
-        text = snippets.get(kind)
+        text = _SNIPPETS.get(kind)
         if text:
             cursor = self._current_editor().textCursor()
             cursor.insertText(text)
             self.status.showMessage(f"Inserted {kind} snippet", 2000)
 
+    @staticmethod
+    def _copy_figure(source: Path, destination: Path) -> None:
+        # Images do not need their mode bits, so skip shutil.copy's chmod and let
+        # copyfile use the kernel fast path (sendfile/fcopyfile/CopyFile2).
+        if sys.platform.startswith("linux") and not destination.exists():
+            # On btrfs/XFS a reflink clone shares extents and is O(1).
+            import fcntl
+
+            ficlone = 0x40049409
+            try:
+                with open(source, "rb") as src, open(destination, "xb") as dst:
+                    fcntl.ioctl(dst.fileno(), ficlone, src.fileno())
+                return
+            except OSError:
+                pass  # not supported here; copyfile overwrites the empty file
+        shutil.copyfile(source, destination)
+
     def add_figure_from_file(self) -> None:
         editor = self._current_editor()
         path, _ = QFileDialog.getOpenFileName(
@@ -1313,7 +2423,7 @@ def hello():
         destination = images_dir / source.name
 
         try:
-            shutil.copy(source, destination)
+            self._copy_figure(source, destination)
         except OSError as exc:
             QMessageBox.critical(self, "Copy failed", f"Could not copy image: {exc}")
             return
@@ -1388,29 +2498,49 @@ def hello():
         self._update_search_highlights(term, use_regex)
 
     def _update_search_highlights(self, term: str, use_regex: bool) -> None:
-        editor = self._current_editor()
+        self._search_highlight_query = (term, use_regex)
         if not term:
-            editor.setExtraSelections([])
+            self._highlight_timer.stop()
+            self._current_editor().setExtraSelections([])
             return
+        self._highlight_timer.start()
 
+    def _schedule_search_highlights(self, *_args) -> None:
+        if self._search_highlight_query[0]:
+            self._highlight_timer.start()
+
+    def _apply_search_highlights(self) -> None:
+        term, use_regex = self._search_highlight_query
+        if not term:
+            return
+        editor = self._current_editor()
+        document = editor.document()
         fmt = QTextCharFormat()
         fmt.setBackground(QColor("#ffe8b5"))
         fmt.setForeground(QColor("#0b172a"))
 
+        viewport = editor.viewport().rect()
+        last_block = editor.cursorForPosition(viewport.bottomRight()).block()
+        last_position = last_block.position() + last_block.length()
         selections: list[QTextEdit.ExtraSelection] = []
-        cursor = QTextCursor(editor.document())
+        cursor = QTextCursor(editor.firstVisibleBlock())
         expression = QRegularExpression(term) if use_regex else term
 
-        while True:
-            found = editor.document().find(expression, cursor)
-            if found.isNull():
+        while len(selections) < self.MAX_SEARCH_HIGHLIGHTS:
+            found = document.find(expression, cursor)
+            if found.isNull() or found.selectionStart() >= last_position:
                 break
             selection = QTextEdit.ExtraSelection()
             selection.cursor = found
             selection.format = fmt
             selections.append(selection)
-            cursor = found
+            cursor = QTextCursor(found)
             cursor.setPosition(found.selectionEnd())
+            # An empty regex match would be found again at the same spot.
+            if found.selectionStart() == found.selectionEnd() and not cursor.movePosition(
+                QTextCursor.MoveOperation.NextCharacter
+            ):
+                break
 
         editor.setExtraSelections(selections)
 
@@ -1437,7 +2567,7 @@ def hello():
         selected_text = cursor.selectedText()
         try:
             if use_regex:
-                new_text = re.sub(term, replacement, selected_text, count=1)
+                new_text = _search_pattern(term).sub(replacement, selected_text, count=1)
             else:
                 new_text = selected_text.replace(term, replacement, 1)
         except re.error as exc:
@@ -1460,19 +2590,70 @@ def hello():
             return
 
         editor = self._current_editor()
-        text = editor.toPlainText()
+        document = editor.document()
         try:
             if use_regex:
-                new_text = re.sub(term, replacement, text)
+                replaced = self._replace_all_regex(document, _search_pattern(term), replacement)
             else:
-                new_text = text.replace(term, replacement)
+                replaced = self._replace_all_plain(document, term, replacement)
         except re.error as exc:
             QMessageBox.warning(self, "Regex error", f"Invalid regex: {exc}")
             return
 
-        editor.setPlainText(new_text)
         self._update_search_highlights(term, use_regex)
-        self.status.showMessage("Replaced all occurrences", 2000)
+        self.status.showMessage(f"Replaced {replaced} occurrences", 2000)
+
+    @staticmethod
+    def _replace_all_plain(document: QTextDocument, term: str, replacement: str) -> int:
+        # Replace match by match inside one edit block instead of swapping the
+        # whole buffer: undo history survives and only touched lines are
+        # re-highlighted.
+        replaced = 0
+        edit = QTextCursor(document)
+        edit.beginEditBlock()
+        cursor = QTextCursor(document)
+        while True:
+            found = document.find(term, cursor, QTextDocument.FindFlag.FindCaseSensitively)
+            if found.isNull():
+                break
+            found.insertText(replacement)
+            replaced += 1
+            cursor = found
+        edit.endEditBlock()
+        return replaced
+
+    @staticmethod
+    def _replace_all_regex(document: QTextDocument, pattern: re.Pattern, replacement: str) -> int:
+        # Match with Python's re over the whole text, exactly like re.sub,
+        # so case, anchors and lookarounds behave as in the pattern; then
+        # edit only the matched spans, last first so earlier offsets hold.
+        text = document.toPlainText()
+        edits = []
+        for match in pattern.finditer(text):
+            new_text = match.expand(replacement)
+            if new_text != match.group():
+                edits.append((match.start(), match.end(), new_text))
+        if not edits:
+            return 0
+
+        # QTextDocument positions count UTF-16 code units, not code points.
+        positions: list[tuple[int, int, str]] = []
+        consumed = offset = 0
+        for start, end, new_text in edits:
+            offset += len(text[consumed:start].encode("utf-16-le")) // 2
+            length = len(text[start:end].encode("utf-16-le")) // 2
+            positions.append((offset, offset + length, new_text))
+            offset += length
+            consumed = end
+
+        cursor = QTextCursor(document)
+        cursor.beginEditBlock()
+        for start, end, new_text in reversed(positions):
+            cursor.setPosition(start)
+            cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText(new_text)
+        cursor.endEditBlock()
+        return len(edits)
 
     def show_about(self) -> None:
         QMessageBox.information(
@@ -1491,6 +2672,7 @@ def hello():
         QMessageBox.information(self, "Project files", message)
 
     def ask_document_assistant(self) -> None:
+        self.assistant.warm_up()
         if self.chat_dialog is None:
             self.chat_dialog = ChatDialog(self, self._send_assistant_prompt)
             intro = (
@@ -4,25 +4,24 @@ from pathlib import Path
 
 
 PROJECT_ROOT = Path(__file__).parent
-MAIN_FILE = PROJECT_ROOT / "app" / "main.py"
 DIST_DIR = PROJECT_ROOT / "dist"
+SPEC_FILE = PROJECT_ROOT / "platex.spec"
+EXE_NAME = "platex.exe" if sys.platform == "win32" else "platex"
+ONEFILE_NAME = "platex-onefile.exe" if sys.platform == "win32" else "platex-onefile"
 
 
-def build() -> int:
-    command = [
-        sys.executable,
-        "-m",
-        "PyInstaller",
-        "--noconfirm",
-        "--onefile",
-        "--name",
-        "platex",
-        str(MAIN_FILE),
-    ]
+def build(onefile: bool = False) -> int:
+    # Build options live in platex.spec. Without --clean, PyInstaller reuses
+    # the analysis cached under build/ and only re-checks what changed.
+    # --onedir (the default) starts instantly; --onefile unpacks everything
+    # to a temp dir on every launch, so it is opt-in.
+    command = [sys.executable, "-m", "PyInstaller", "--noconfirm", str(SPEC_FILE)]
+    if onefile:
+        command += ["--", "--onefile"]
     print("Running:", " ".join(command))
     result = subprocess.run(command, cwd=PROJECT_ROOT)
     if result.returncode == 0:
-        built = DIST_DIR / ("platex.exe" if sys.platform == "win32" else "platex")
+        built = DIST_DIR / ONEFILE_NAME if onefile else DIST_DIR / "platex" / EXE_NAME
         print(f"Build succeeded → {built}")
     else:
         print("Build failed")
@@ -30,4 +29,4 @@ def build() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(build())
+    raise SystemExit(build(onefile="--onefile" in sys.argv[1:]))
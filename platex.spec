@@ -0,0 +1,62 @@
+# -*- mode: python ; coding: utf-8 -*-
+# PyInstaller build recipe used by build.py. Pass "-- --onefile" to get a
+# single self-extracting executable instead of the dist/platex/ folder. It is
+# named platex-onefile so it never collides with that folder; on macOS/Linux
+# both would otherwise be dist/platex.
+import os
+import sys
+
+ONEFILE = "--onefile" in sys.argv[1:]
+
+# Pulled in by PyInstaller's hooks but never imported by the app.
+EXCLUDED_MODULES = [
+    "tkinter",
+    "PySide6.QtQml",
+    "PySide6.QtQuick",
+    "PySide6.QtWebEngineCore",
+    "PySide6.QtWebEngineWidgets",
+    "PySide6.QtMultimedia",
+    "PySide6.Qt3DCore",
+]
+
+a = Analysis(
+    [os.path.join(SPECPATH, "app", "main.py")],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=EXCLUDED_MODULES,
+    noarchive=False,
+)
+pyz = PYZ(a.pure)
+
+if ONEFILE:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        name="platex-onefile",
+        debug=False,
+        strip=False,
+        upx=False,
+        runtime_tmpdir=None,
+        console=True,
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name="platex",
+        debug=False,
+        strip=False,
+        upx=False,
+        console=True,
+    )
+    coll = COLLECT(exe, a.binaries, a.datas, strip=False, upx=False, name="platex")
@@ -66,7 +66,7 @@ function EnsureLatex {
 function BuildIfPossible {
     Push-Location $ProjectDir
     try {
-        Write-Host "Building one-file executable with PyInstaller..." -ForegroundColor Cyan
+        Write-Host "Building executable with PyInstaller..." -ForegroundColor Cyan
         python build.py
     }
     catch {
@@ -77,7 +77,10 @@ function BuildIfPossible {
 
 function LaunchApp {
     Push-Location $ProjectDir
-    $exe = Join-Path "dist" "platex.exe"
+    $exe = Join-Path "dist" (Join-Path "platex" "platex.exe")
+    if (-not (Test-Path $exe)) {
+        $exe = Join-Path "dist" "platex-onefile.exe"
+    }
     if (Test-Path $exe) {
         Write-Host "Launching packaged app..." -ForegroundColor Green
         & $exe
@@ -73,7 +73,7 @@ install_latex() {
 
 build_if_possible() {
   cd "$PROJECT_DIR"
-  echo "Building one-file executable with PyInstaller (optional)..."
+  echo "Building executable with PyInstaller (optional)..."
   if ! $PYTHON build.py; then
     echo "Build failed; will run from source." >&2
   fi
@@ -82,9 +82,12 @@ build_if_possible() {
 
 launch_app() {
   cd "$PROJECT_DIR"
-  if [ -f dist/platex ]; then
+  if [ -f dist/platex/platex ]; then
     echo "Launching packaged app..."
-    ./dist/platex &
+    ./dist/platex/platex &
+  elif [ -f dist/platex-onefile ]; then
+    echo "Launching packaged app..."
+    ./dist/platex-onefile &
   else
     echo "Launching from source..."
     $PYTHON app/main.py &
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import main  # noqa: E402
+
+SAMPLES = [
+    "",
+    "\\section{Intro}\n\\includegraphics{a.png}\n\\section{End}\n",
+    "! Undefined control sequence \\includegraphics{a} \\section{b}\n\\section{c}\n",
+    "\\includegraphics{! not an error}\n! Missing $ inserted.\n",
+    "\\section{\\includegraphics{x}}\n\\includegraphics{\\section{y}}\n",
+    "! first\n! second \\section{z}\n",
+    "\\section{multi\nline} ! é accents\n\\includegraphics{é.png}",
+    "! \\includegraphics{spans\nlines}\n\\includegraphics{next}\n",
+]
+
+
+def regex_stats(document):
+    counts = {"figure": 0, "section": 0, "error": 0}
+    first_error = None
+    for match in main._DOC_STATS_RE.finditer(document):
+        counts[match.lastgroup] += 1
+        if match.lastgroup == "error" and first_error is None:
+            first_error = match.group("errmsg")
+    return counts["figure"], counts["section"], first_error
+
+
+class DocumentStatsTest(unittest.TestCase):
+    def test_error_line_hides_constructs_after_it(self):
+        self.assertEqual(
+            regex_stats(SAMPLES[2]),
+            (0, 1, "Undefined control sequence \\includegraphics{a} \\section{b}"),
+        )
+
+    @unittest.skipIf(main.hyperscan is None, "hyperscan is not installed")
+    def test_hyperscan_matches_regex(self):
+        for document in SAMPLES:
+            with self.subTest(document=document):
+                stats = main._document_stats_hyperscan(document)
+                # None hands the document back to the regex pass.
+                if stats is not None:
+                    self.assertEqual(stats, regex_stats(document))
+                main._document_stats.cache_clear()
+                self.assertEqual(main._document_stats(document), regex_stats(document))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import main  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+PREAMBLE_A = "\\documentclass{article}\n\\begin{document}\nhi\n\\end{document}\n"
+PREAMBLE_B = "\\documentclass{article}\n\\usepackage{amsmath}\n\\begin{document}\nhi\n\\end{document}\n"
+
+
+class PreambleFormatTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.window = main.EditorWindow()
+        self.window.live_preview_enabled = False
+        self.editor = self.window._current_editor()
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.tex_file = Path(temp.name) / "main.tex"
+        self.shadow = Path(temp.name) / "shadow"
+        self.shadow.mkdir()
+        self.fmt_file = self.shadow / "main-preamble.fmt"
+
+    def format_args(self, dump):
+        # Any program that rejects the -ini arguments stands in for a format
+        # dump that exits non-zero.
+        return self.window._preamble_format_args(
+            sys.executable,
+            self.tex_file,
+            self.tex_file,
+            self.shadow,
+            self.editor,
+            self.window._live_env,
+            dump=dump,
+        )
+
+    def test_failed_dump_invalidates_previous_format(self):
+        self.editor.setPlainText(PREAMBLE_A)
+        self.window._preamble_formats[str(self.tex_file)] = main.EditorWindow._preamble_digest(self.editor)
+        self.fmt_file.write_bytes(b"format A")
+        self.assertEqual(self.format_args(dump=False), ["-fmt=main-preamble"])
+
+        self.editor.setPlainText(PREAMBLE_B)
+        self.assertEqual(self.format_args(dump=True), [])
+        process = self.window._format_proc
+        self.assertIsNotNone(process)
+        # While B's dump rewrites the file, A must not load it either.
+        self.editor.setPlainText(PREAMBLE_A)
+        self.assertEqual(self.format_args(dump=False), [])
+
+        process.waitForFinished(10_000)
+        self.app.processEvents()
+        self.assertIsNone(self.window._format_proc)
+        self.assertFalse(self.fmt_file.exists())
+        self.assertEqual(self.format_args(dump=False), [])
+
+
+if __name__ == "__main__":
+    unittest.main()